@@ -36,6 +36,84 @@ def calc_wgt( double xg, double yg,  _np.ndarray[_np.float64_t, ndim=1] xnode,\
     return wgt
 
 
+def calc_grid_values(xg, yg, xnode, ynode, values, smoothing, tile_size=1024, block=2**22, jobs=1):
+    # Gaussian-weighted averages (nvals x ngp) of data values (nvals x ndp) at
+    # grid points (xg, yg). calc_wgt weights are zero unless
+    # alpha * distance**2 < smoothing, so only the data points (xnode, ynode)
+    # within that radius of a tile of grid points (grid_tiles) are used; they
+    # are found with a KD-tree. The weights of a tile are computed as a 2-D
+    # array of at most 'block' elements (larger tiles are split into chunks)
+    # and all value columns are reduced in one matrix product. With jobs > 1,
+    # groups of tiles are gridded by a pool of processes (same results)
+    from . import io
+    xg = np.asarray(xg, dtype=float)
+    yg = np.asarray(yg, dtype=float)
+    xnode = np.asarray(xnode, dtype=float)
+    ynode = np.asarray(ynode, dtype=float)
+    values = np.asarray(values, dtype=float).reshape(-1, len(xnode))
+    gval = np.full((len(values), len(xg)), np.nan)
+    if len(xg) == 0 or len(xnode) == 0:
+        return gval
+    tiles = grid_tiles(xg, yg, tile_size)
+    # tasks: groups of consecutive tiles (a few per process)
+    ntasks = min(len(tiles), 4 * jobs) if jobs > 1 else 1
+    bounds = np.linspace(0, len(tiles), ntasks + 1).astype(int)
+    tasks = [tiles[bounds[i]:bounds[i+1]] for i in range(ntasks)]
+    arrays = {'xg': xg, 'yg': yg, 'xnode': xnode, 'ynode': ynode, 'values': values}
+    results = io.imap_shared(_grid_tiles_values, tasks, arrays, jobs, smoothing, block)
+    for task, tiles_gval in zip(tasks, results):
+        for tile, tile_gval in zip(task, tiles_gval):
+            gval[:, tile] = tile_gval
+    return gval
+
+
+def _grid_tiles_values(tiles, arrays, smoothing, block):
+    # calc_grid_values of a group of tiles: list of (nvals x tile size) arrays
+    from scipy.spatial import cKDTree
+    xg, yg = arrays['xg'], arrays['yg']
+    xnode, ynode, values = arrays['xnode'], arrays['ynode'], arrays['values']
+    alpha = 1 / (smoothing ** 2)
+    radius = smoothing ** 1.5 * (1 + 1e-9)
+    tree = cKDTree(np.column_stack([xnode, ynode]))
+    tiles_gval = []
+    for tile in tiles:
+        # data points within the radius of any grid point of the tile
+        xmin, xmax = xg[tile].min(), xg[tile].max()
+        ymin, ymax = yg[tile].min(), yg[tile].max()
+        half_diagonal = np.hypot(xmax - xmin, ymax - ymin) / 2
+        near = tree.query_ball_point([(xmin + xmax) / 2, (ymin + ymax) / 2],
+                                     radius + half_diagonal, return_sorted=True)
+        near = np.array(near, dtype=int)
+        xnear, ynear, vnear = xnode[near], ynode[near], values[:, near]
+        tile_gval = np.zeros((len(values), len(tile)))
+        nchunk = max(1, block // max(1, len(near)))
+        for ic in range(0, len(tile), nchunk):
+            igp = tile[ic:ic+nchunk]
+            adistsq = alpha * ((xg[igp, None] - xnear)**2 + (yg[igp, None] - ynear)**2)
+            wgt = np.where(adistsq < smoothing, np.exp(-adistsq), 0)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                tile_gval[:, ic:ic+nchunk] = (vnear @ wgt.T) / np.sum(wgt, axis=1)
+        tiles_gval.append(tile_gval)
+    return tiles_gval
+
+
+def grid_tiles(xg, yg, tile_size=1024):
+    # grid point indices in spatial tiles of about 'tile_size' points: the
+    # bounding box of the points is split into a regular grid of cells
+    xg = np.asarray(xg, dtype=float)
+    yg = np.asarray(yg, dtype=float)
+    ntiles = int(np.ceil(np.sqrt(len(xg) / tile_size)))
+    cell = np.zeros(len(xg), dtype=int)
+    for coord in [xg, yg]:
+        cmin, cmax = coord.min(), coord.max()
+        icell = np.zeros(len(coord), dtype=int) if cmax == cmin \
+                else np.minimum((coord - cmin) / (cmax - cmin) * ntiles, ntiles - 1).astype(int)
+        cell = cell * ntiles + icell
+    order = np.argsort(cell, kind='stable')
+    tile_start = np.flatnonzero(np.diff(cell[order], prepend=-1))
+    return np.split(order, tile_start[1:])
+
+
 ##############################
 # ADAPTIVE GRIDDING FUNCTIONS (JUST FOR TEST AT THIS STAGE!)
 
@@ -108,7 +108,7 @@ def datasets_1Dto3D(args):
     args.sort = False
     args.uniq = False
     args.append = False
-    io.output_lines(model_3D, args)
+    io.output_lines(model_3D, args, names=['x', 'y', 'fid'] + [f"v{iv}" for iv in args.v])
 
 #-----------------------#
 
@@ -198,7 +198,7 @@ def datasets_2Dto3D(args):
     args.sort = False
     args.uniq = False
     args.append = False
-    io.output_lines(output_lines, args)
+    io.output_lines(output_lines, args, names=['x', 'y', 'fid'] + [f"v{iv}" for iv in args.v])
 
 #-------------------------#        
 
@@ -318,35 +318,31 @@ def dat2nc(args):
         polygon_file = args.polygon
         if os.path.splitext(polygon_file)[1] == ".shp":
             # if polygon_file is *.shp
-            polygons = io.read_polygon_shp(polygon_file)
+            polygons = io.read_polygon_shp_features(polygon_file)
         else:
             # else if polygon_file is not *.shp (ascii file)
             polygon_data = io.read_numerical_data(polygon_file, 0, 0, [".10",".10"], args.x, [])
-            polygons = [[polygon_data[0][0], polygon_data[0][1]]]
+            polygons = [[[polygon_data[0][0], polygon_data[0][1]]]]
 
         if not len(polygons):
             print(f"Error: polygon is not specified. Please check polygon file.")
             exit(1)
 
+    points_rounded = np.around(read_data_points, decimals=int(args.fmt[0][-1])).reshape(-1, 2)
+    points = geographic.PointArray(points_rounded[:, 0], points_rounded[:, 1])
+    if args.polygon:
+        # point-in-polygon test of the rounded points (in any of the polygons)
+        polygons = geographic.PolygonCollection(polygons, spherical=args.spherical)
+        is_pip = polygons.contains(points.lon, points.lat, 'union')
+    else:
+        is_pip = np.ones(len(points), dtype=bool)
+
     data = {}
-    x_uniq = []
-    y_uniq = []
-    for ip, point in enumerate(read_data_points):
-        point = np.around(point, decimals=int(args.fmt[0][-1]))
-        point = geographic.Point(point[0], point[1])
-        if point.lon not in x_uniq:
-            x_uniq.append(point.lon)
-        if point.lat not in y_uniq:
-            y_uniq.append(point.lat)
-        key = f"%{args.fmt[0]}f_%{args.fmt[0]}f" %(point.lon, point.lat)
-        val = f"%{args.fmt[1]}f" %(read_data_values[ip])
-        if args.polygon:
-            for iply in range(len(polygons)):
-                polygon = geographic.Polygon(polygons[iply][0], polygons[iply][1])
-                if polygon.is_point_in(point):
-                    data[f"{key}"] = val
-        else:
-            data[f"{key}"] = val
+    x_uniq = np.unique(points.lon)
+    y_uniq = np.unique(points.lat)
+    for ip in np.flatnonzero(is_pip):
+        key = f"%{args.fmt[0]}f_%{args.fmt[0]}f" %(points.lon[ip], points.lat[ip])
+        data[key] = f"%{args.fmt[1]}f" %(read_data_values[ip])
 
     xSpacing = np.unique( np.around(np.diff(sorted(x_uniq)), decimals=int(args.fmt[0][-1])) )
     ySpacing = np.unique( np.around(np.diff(sorted(y_uniq)), decimals=int(args.fmt[0][-1])) )
@@ -500,29 +496,21 @@ def nc2dat(args):
 
 def gen_nc_dataset_outlines(positional_matrix, values_matrix, fmt = ['.4', '.4']):
     import numpy as np
-    outlines = []
     ndim = len(positional_matrix) # number of dimension
     ndf = len(values_matrix) # number of data fields
-    shape = list(np.shape(values_matrix[0])) # dimension shape
 
-    if ndim == 2:
-        indices = [(i, j) for i in range(shape[0]) for j in range(shape[1])]
-        for index in indices:
-            outlines.append(f"%{fmt[0]}f %{fmt[0]}f" \
-            %(positional_matrix[0][index[0]], positional_matrix[1][index[1]]))
-            for idf in range(ndf):
-                outlines[-1] += f" %{fmt[1]}f" %(values_matrix[idf][index[0]][index[1]])
-    elif ndim == 3:
-        indices = [(i, j, k) for i in range(shape[0]) for j in range(shape[1]) for k in range(shape[2])]
-        for index in indices:
-            outlines.append(f"%{fmt[0]}f %{fmt[0]}f %{fmt[0]}f" \
-            %(positional_matrix[0][index[0]], positional_matrix[1][index[1]], positional_matrix[2][index[2]]))
-            for idf in range(ndf):
-                outlines[-1] += f" %{fmt[1]}f" %(values_matrix[idf][index[0]][index[1]][index[2]])
-    else:
+    if ndim not in [2, 3]:
         print(f"Error! This is not a 2D or 3D dataset.\nCurrrent version of the program only works for 2D and 3D datasets.")
         exit(1)
 
+    # positional columns in row-major order of the value matrices
+    shape = list(np.shape(values_matrix[0])) # dimension shape
+    positional_vectors = [np.asarray(positional_matrix[i])[:shape[i]] for i in range(ndim)]
+    columns = [grid.ravel() for grid in np.meshgrid(*positional_vectors, indexing='ij')]
+    for idf in range(ndf):
+        columns.append(np.asarray(values_matrix[idf], dtype=float).ravel())
+    row_fmt = ' '.join([f"%{fmt[0]}f"] * ndim) + f" %{fmt[1]}f" * ndf
+    outlines = list(io.format_column_lines(columns, row_fmt))
     return outlines
 
 #############################################
@@ -298,40 +298,106 @@ def add_intersect_values(args):
         fmt = args.fmt
     nof = len(args.input_files)
     input_files = args.input_files
-    datlines = [[] for i in range(nof)]
-    datlines_pos = [[] for i in range(nof)]
-    datlines_vals = [[] for i in range(nof)]
     if nof < 2:
         print("Error! Number of input_files should be larger than 2 for this operation.")
         exit(1)
-    for i in range(nof):
-        datlines[i] = io.data_lines(input_files[i], args)
-        for line in datlines[i]:
-            datlines_pos[i].append(' '.join(line.split()[0:len(args.x)]))
-            datlines_vals[i].append(' '.join(line.split()[len(args.x):]))
-    intersect = []
-    intersect_pos = []
-    intersect_add_vals = []
-    nol = len(datlines[0])
-    for j in range(nol):
-        if all(datlines_pos[0][j] in l for l in datlines_pos[1:])\
-        and datlines_pos[i][j] not in intersect_pos:
-            added_vals = [0 for ivc in range(len(args.v))]
-            for ivc in range(len(args.v)):
-                for idc in range(nof):
-                    added_vals[ivc] += float(datlines_vals[idc][j].split()[ivc])
-                added_vals[ivc] = f"%{fmt[1]}f" %(added_vals[ivc])
-            intersect_pos.append(datlines_pos[0][j])
-            intersect_add_vals.append(' '.join(added_vals))
-            intersect.append(f"{intersect_pos[-1]} {intersect_add_vals[-1]}")
-
+    npos = len(args.x)
+    nvals = len(args.v)
+    if args.presorted:
+        if args.tolerance > 0:
+            print("Error! Argument '--tolerance' is not supported with '--presorted'.")
+            exit(1)
+        # first line of every file at positions that are in all files
+        matched = ((pos, [lines[0] for lines in groups])
+                   for pos, groups in merge_position_groups(input_files, args, npos)
+                   if all(lines is not None for lines in groups))
+    else:
+        datlines = list(io.imap_files(io.data_lines, input_files, args.jobs, args))
+        matched = matched_lines(datlines, npos, args.tolerance)
+    intersect = added_values_lines(matched, npos, nvals, fmt[1], args.average)
     args.uniq = False # it's already uniq!
-    if len(intersect) == 0:
-        print("Error! Number of calculated nodes is zero!")
-        exit(1)
+    intersect = nonempty_lines(intersect, "Error! Number of calculated nodes is zero!")
     io.output_lines(intersect, args)
 
 
+def added_values_lines(matched, npos, nvals, fmt, average=False):
+    # matched: (pos, lines) of the matched positions; yields the output lines
+    # with the sum (or average) of the values of the matched lines
+    for pos, lines in matched:
+        added_vals = [0 for ivc in range(nvals)]
+        for line in lines:
+            vals = line.split()[npos:]
+            for ivc in range(nvals):
+                added_vals[ivc] += float(vals[ivc])
+        if average:
+            added_vals = [x / len(lines) for x in added_vals]
+        yield ' '.join([pos] + [f"%{fmt}f" %(x) for x in added_vals])
+
+
+def matched_lines(datlines, npos, tolerance=0):
+    # yields (pos, lines): the matching line of every file for each position
+    # of the first file that is in all files (first line of each position)
+    matches = match_positions(datlines, npos, tolerance)
+    matched_pos = set()
+    for j, line in enumerate(datlines[0]):
+        pos = ' '.join(line.split()[0:npos])
+        if np.any(matches[:, j] < 0) or pos in matched_pos:
+            continue
+        matched_pos.add(pos)
+        yield pos, [datlines[i][matches[i][j]] for i in range(len(datlines))]
+
+
+def match_positions(datlines, npos, tolerance=0):
+    # for each line of the first file, index of the matching line in every
+    # file (-1: no match); positions (first 'npos' columns) match if the
+    # formatted positions are the same (tolerance=0; first matching line),
+    # or the nearest point is within 'tolerance' (KD-tree search)
+    pos_first = [' '.join(line.split()[0:npos]) for line in datlines[0]]
+    matches = np.full((len(datlines), len(pos_first)), -1, dtype=int)
+    matches[0] = np.arange(len(pos_first))
+    if tolerance > 0:
+        xy_first = positions_array(pos_first, npos)
+    for i in range(1, len(datlines)):
+        pos = [' '.join(line.split()[0:npos]) for line in datlines[i]]
+        if tolerance > 0:
+            matches[i] = nearest_within_tolerance(xy_first, positions_array(pos, npos), tolerance)
+        else:
+            first_line = {}
+            for j, p in enumerate(pos):
+                first_line.setdefault(p, j)
+            matches[i] = [first_line.get(p, -1) for p in pos_first]
+    return matches
+
+
+def positions_array(pos, npos):
+    # formatted positions -> float array with shape (nol, npos)
+    xy = np.full((len(pos), npos), np.nan)
+    for j, p in enumerate(pos):
+        items = p.split()
+        if len(items) == npos:
+            try:
+                xy[j] = [float(x) for x in items]
+            except ValueError:
+                pass
+    return xy
+
+
+def nearest_within_tolerance(xy_ref, xy, tolerance):
+    # index of the nearest point in 'xy' for each point in 'xy_ref'
+    # (-1: no point within 'tolerance'); points with nan coordinates never match
+    from scipy.spatial import cKDTree
+    nearest = np.full(len(xy_ref), -1, dtype=int)
+    valid = np.flatnonzero(~np.isnan(xy).any(axis=1))
+    valid_ref = np.flatnonzero(~np.isnan(xy_ref).any(axis=1))
+    if len(valid) == 0 or len(valid_ref) == 0:
+        return nearest
+    tree = cKDTree(xy[valid])
+    dist, indx = tree.query(xy_ref[valid_ref], k=1, distance_upper_bound=np.nextafter(tolerance, np.inf))
+    found = np.isfinite(dist)
+    nearest[valid_ref[found]] = valid[indx[found]]
+    return nearest
+
+
 def nodes(args):
     try:
         from . import _geographic as geographic
@@ -353,7 +419,6 @@ def nodes(args):
         print(f"Error! Argument 'ystep' should have a positive value!")
         exit(1)
 
-    x_vals, y_vals, z_vals, output_lines = [[],[],[],[]]
     if args.zrange != None: # 3D
         if args.zrange[0] >= args.zrange[1]:
             print(f"Error! Argument 'zrange' should be entered in [min_z, max_z] format.")
@@ -365,54 +430,53 @@ def nodes(args):
             print(f"Error! Argument 'zstep' should have a positive value!")
             exit(1)
 
-        # calculate nodes (3D)
-        for z in np.arange(args.zrange[0], args.zrange[1] + args.zstep, args.zstep):
-            for x in np.arange(args.xrange[0], args.xrange[1] + args.xstep, args.xstep):
-                for y in np.arange(args.yrange[0], args.yrange[1] + args.ystep, args.ystep):
-                    x_vals.append(round(x, 10))
-                    y_vals.append(round(y, 10))
-                    z_vals.append(round(z, 10))
+        # calculate nodes (3D); z varies slowest, then x, then y
+        z_vals, x_vals, y_vals = np.meshgrid(
+            np.round(np.arange(args.zrange[0], args.zrange[1] + args.zstep, args.zstep), 10),
+            np.round(np.arange(args.xrange[0], args.xrange[1] + args.xstep, args.xstep), 10),
+            np.round(np.arange(args.yrange[0], args.yrange[1] + args.ystep, args.ystep), 10),
+            indexing='ij')
+        z_vals = z_vals.ravel()
 
     else: # 2D
-        # calculate nodes (2D)
-        for x in np.arange(args.xrange[0], args.xrange[1] + args.xstep, args.xstep):
-            for y in np.arange(args.yrange[0], args.yrange[1] + args.ystep, args.ystep):
-                    x_vals.append(round(x, 10))
-                    y_vals.append(round(y, 10))
-
-    # store calculated node in output_lines
+        # calculate nodes (2D); x varies slowest, then y
+        x_vals, y_vals = np.meshgrid(
+            np.round(np.arange(args.xrange[0], args.xrange[1] + args.xstep, args.xstep), 10),
+            np.round(np.arange(args.yrange[0], args.yrange[1] + args.ystep, args.ystep), 10),
+            indexing='ij')
+    node_points = geographic.PointArray(x_vals, y_vals)
+
+    # point-in-polygon: read polygons
     if args.polygon:
         if os.path.splitext(args.polygon)[1] == ".shp":
             # if args.polygon is *.shp
-            polygons = io.read_polygon_shp(args.polygon)
+            polygons = io.read_polygon_shp_features(args.polygon)
         else:
             # else if args.polygon is not *.shp (ascii file)
             polygon_data = io.read_numerical_data(args.polygon, 0, 0, [".10",".10"], [1,2], [])
-            polygons = [[polygon_data[0][0], polygon_data[0][1]]]
+            polygons = [[[polygon_data[0][0], polygon_data[0][1]]]]
+        polygons = geographic.PolygonCollection(polygons, spherical=args.spherical)
+
+    include_point = np.ones(len(node_points), dtype=bool)
+    if args.polygon:
+        # nodes must be in all polygons
+        include_point &= polygons.contains(node_points.lon, node_points.lat, 'intersection')
+
+    if args.zrange != None: # 3D
+        output_columns = [node_points.lon[include_point], node_points.lat[include_point], z_vals[include_point]]
+        output_names = ['x', 'y', 'z']
+        row_fmt = f"%{args.fmt[0]}f %{args.fmt[1]}f %{args.fmt[2]}f"
     else:
-        include_point = True
-
-    for i, x in enumerate(x_vals):
-        include_point = True
-        if args.polygon:
-            point = geographic.Point(x, y_vals[i])
-            for iply in range(len(polygons)):
-                polygon = geographic.Polygon(polygons[iply][0], polygons[iply][1])
-                if not polygon.is_point_in(point):
-                    include_point = False
-
-        if include_point:
-            if args.zrange != None: # 3D
-                output_lines.append(f"%{args.fmt[0]}f %{args.fmt[1]}f %{args.fmt[2]}f" %(x, y_vals[i], z_vals[i]))
-            else:
-                output_lines.append(f"%{args.fmt[0]}f %{args.fmt[1]}f" %(x, y_vals[i]))
+        output_columns = [node_points.lon[include_point], node_points.lat[include_point]]
+        output_names = ['x', 'y']
+        row_fmt = f"%{args.fmt[0]}f %{args.fmt[1]}f"
     args.sort = False
     args.uniq = False
     args.append = False
-    if len(output_lines) == 0:
+    if np.sum(include_point) == 0:
         print("Error! Number of calculated nodes is zero!")
         exit(1)
-    io.output_lines(output_lines, args)
+    io.write_column_lines(output_columns, row_fmt, args, names=output_names)
 
 
 
@@ -448,7 +512,7 @@ def gridder(args):
             print(f"Error! 'spacing' should be positive.")
             exit(1)
     else:
-        nodes_xy, _, _ = io.read_numerical_data(args.nodes, 0, 0, [".10",".10"], [1,2], [], skipnan=True)
+        nodes_xy, _, _ = io.read_numerical_data(args.nodes, 0, 0, [".10",".10"], [1,2], [], skipnan=True, noextra=True)
         nodes_x = nodes_xy[0]
         nodes_y = nodes_xy[1]
 
@@ -456,6 +520,14 @@ def gridder(args):
         print(f"Error! 'smoothing' should be positive.")
         exit(1)
 
+    if args.tile is not None and args.tile < 1:
+        print(f"Error! 'tile' should be positive.")
+        exit(1)
+
+    if args.tile and not outfile_orig:
+        print(f"Error! Out-of-core gridding ('tile') requires an output file ('outfile').")
+        exit(1)
+
     if args.xrange[0] >= args.xrange[1]:
         print(f"Error! Argument 'xrange' should be entered in [min_x, max_x] format.")
         exit(1)
@@ -482,35 +554,24 @@ def gridder(args):
 
     nof = len(args.input_files)
     input_files = args.input_files
-    datlines = [[] for i in range(nof)]
     data_xy = [[] for i in range(nof)]
     data_val = [[] for i in range(nof)]
     nvals = len(args.v)
-    for i in range(nof):
-        data_val[i] = [[] for iv in range(nvals)]
     # preprocessing: read data and omit NaNs
-    for i in range(nof):
-        datlines[i] = io.data_lines(input_files[i], args)
-        for line in datlines[i]:
-            xy = line.split()[0:len(args.x)]
-            vals = line.split()[len(args.x):len(args.x)+len(args.v)]
-            if 'nan' not in xy and 'nan' not in vals:
-                xy = np.array(xy, dtype=float).tolist()
-                data_xy[i].append(xy)
-                vals = np.array(vals, dtype=float).tolist()
-                for iv in range(nvals):
-                    data_val[i][iv].append(vals[iv])
+    for i, data in enumerate(io.imap_files(_read_gridder_data, input_files, args.jobs, args, fmt)):
+        data_xy[i], data_val[i] = data
 
     # point in polygon? If so, read polygon data & instantiate polygon object
     if args.polygon:
         polygon_file = args.polygon
         if os.path.splitext(polygon_file)[1] == ".shp":
             # if polygon_file is *.shp
-            polygons = io.read_polygon_shp(polygon_file)
+            polygons = io.read_polygon_shp_features(polygon_file)
         else:
             # else if polygon_file is not *.shp (ascii file)
             polygon_data = io.read_numerical_data(polygon_file, 0, 0, [".10",".10"], [1,2], [])
-            polygons = [[polygon_data[0][0], polygon_data[0][1]]]
+            polygons = [[[polygon_data[0][0], polygon_data[0][1]]]]
+        polygons = geographic.PolygonCollection(polygons, spherical=args.spherical)
 
     # start main process
     # d: data, g: gridded
@@ -560,148 +621,266 @@ def gridder(args):
             minY = args.yrange[0]
             maxY = args.yrange[1]
 
-        ndp = len(dataX) # number of data points
-
         # input data relative coordinates: xnode & ynode
-        xnode = [];  ynode = []
-        for ip in range(ndp):
-            point = geographic.Point(dataX[ip], dataY[ip])
-            line = geographic.Line(point_app, point)
-
-            delta = line.calc_gcarc()
-            tazim = line.calc_az()
-
-            deltadiff = delta - deltaref
-            if deltadiff > 180:
-                deltadiff -= 360
-            elif deltadiff < -180:
-                deltadiff += 360
-            xnode.append(circ * deltadiff)
-            
-            tazdiff = tazimref - tazim
-            if tazdiff > 180:
-                tazdiff -= 360
-            elif tazdiff < -180:
-                tazdiff += 360
-            ynode.append(circ * sin(radians(delta)) * tazdiff)
+        data_points = geographic.PointArray(dataX, dataY)
+        xnode, ynode = _gridder_relative_coords(data_points, point_app, deltaref, tazimref, circ)
+
+        if args.tile:
+            # out-of-core gridding: nodes are generated, gridded and written tile by tile
+            def grid_tile(gridx, gridy):
+                rxgrid, rygrid = _gridder_relative_coords(geographic.PointArray(gridx, gridy),
+                                                          point_app, deltaref, tazimref, circ)
+                return funcs.calc_grid_values(rxgrid, rygrid, xnode, ynode, data_val[idat],
+                                              args.smoothing, jobs=args.jobs)
+            grid = [nodes_x, nodes_y] if args.nodes else [minX, maxX, minY, maxY]
+            _gridder_tiles(args, input_files[idat], _gridder_outfile(outfile_orig, input_files[idat], nof),
+                           fmt, grid, grid_tile, skipnan_orig, polygons if args.polygon else None)
+            continue
 
         # grid coordinates
-        gridx = []; gridy = []
-        rxgrid = [];  rygrid = []
         if args.nodes:
             ngp = len(nodes_x) # number of grid points
-            for ix, x in enumerate(nodes_x):
-                y = nodes_y[ix]
-                point = geographic.Point(x, y)
-                line = geographic.Line(point_app, point)
-
-                delta = line.calc_gcarc()
-                tazim = line.calc_az()
-
-                deltadiff = delta - deltaref
-                if deltadiff > 180:
-                    deltadiff -= 360
-                elif deltadiff < -180:
-                    deltadiff += 360
-                
-                tazdiff =tazimref-tazim
-                if tazdiff > 180:
-                    tazdiff -= 360
-                elif tazdiff < -180:
-                    tazdiff += 360
-                
-                gridx.append(x)
-                gridy.append(y)
-                rxgrid.append(circ * deltadiff)
-                rygrid.append(circ * sin(radians(delta)) * tazdiff)
+            gridx = np.array(nodes_x, dtype=float)
+            gridy = np.array(nodes_y, dtype=float)
         else:
             xinc = args.spacing[0]
             yinc = args.spacing[1]
             nx = int(((maxX-minX)/xinc)+1)
             ny = int(((maxY-minY)/yinc)+1)
             ngp = nx * ny # number of grid points
-            for ix in range(nx):
-                x = minX + ix*xinc
-                for iy in range(ny):
-                    y = minY + iy*yinc
-
-                    point = geographic.Point(x, y)
-                    line = geographic.Line(point_app, point)
-
-                    delta = line.calc_gcarc()
-                    tazim = line.calc_az()
-
-                    deltadiff = delta - deltaref
-                    if deltadiff > 180:
-                        deltadiff -= 360
-                    elif deltadiff < -180:
-                        deltadiff += 360
-                    
-                    tazdiff =tazimref-tazim
-                    if tazdiff > 180:
-                        tazdiff -= 360
-                    elif tazdiff < -180:
-                        tazdiff += 360
-                    
-                    gridx.append(x)
-                    gridy.append(y)
-                    rxgrid.append(circ * deltadiff)
-                    rygrid.append(circ * sin(radians(delta)) * tazdiff)
-
-        # gridding 
-        out_lines = []
-        gval = [np.zeros(ngp).tolist() for x in range(nvals)]
-        for igp in range(ngp):
-            line = f"%{fmt[0]}f %{fmt[0]}f" %(gridx[igp], gridy[igp])
-            xnode = np.array(xnode)
-            ynode = np.array(ynode)
-            wgt = funcs.calc_wgt(rxgrid[igp], rygrid[igp], xnode, ynode, args.smoothing)
-            wgtsum = np.sum(wgt)
+            # x varies slowest, then y
+            gridx = np.repeat(minX + np.arange(nx)*xinc, ny)
+            gridy = np.tile(minY + np.arange(ny)*yinc, nx)
 
-            for iv in range(nvals):
-
-                with warnings.catch_warnings():
-                    warnings.simplefilter('ignore')
-                    gval[iv][igp] += np.sum(wgt * np.array(data_val[idat][iv])) / wgtsum
+        grid_points = geographic.PointArray(gridx, gridy)
+        rxgrid, rygrid = _gridder_relative_coords(grid_points, point_app, deltaref, tazimref, circ)
 
-                line = f"{line} %{fmt[1]}f" %(gval[iv][igp])
+        # gridding: tiles of grid points against their nearby data points
+        gval = funcs.calc_grid_values(rxgrid, rygrid, xnode, ynode, data_val[idat], args.smoothing,
+                                      jobs=args.jobs)
 
-            point = geographic.Point(float(line.split()[0]), float(line.split()[1]))
-
-            if skipnan_orig:
-                if 'nan' not in line.split():
-                    if args.polygon:
-                        for iply in range(len(polygons)):
-                            polygon = geographic.Polygon(polygons[iply][0], polygons[iply][1])
-                            if polygon.is_point_in(point):
-                                out_lines.append(line)
-                    else:
-                        out_lines.append(line)
-            else:
-                if args.polygon:
-                    for iply in range(len(polygons)):
-                        polygon = geographic.Polygon(polygons[iply][0], polygons[iply][1])
-                        if polygon.is_point_in(point):
-                            out_lines.append(line)
-                else:
-                    out_lines.append(line)
+        # grid points to output
+        keep = _gridder_keep(gridx, gridy, gval, fmt, skipnan_orig,
+                             polygons if args.polygon else None)
+        out_columns = [col[keep] for col in [gridx, gridy, *gval]]
+        out_names = ['x', 'y'] + [f"v{iv}" for iv in args.v]
+        row_fmt = f"%{fmt[0]}f %{fmt[0]}f" + f" %{fmt[1]}f" * nvals
 
         # output results
         args.append = False
         args.sort = True
         args.uniq = False
 
-        if nof > 1 and outfile_orig:
-            if not os.path.isdir(outfile_orig):
-                os.mkdir(outfile_orig)
-            args.outfile = os.path.join(outfile_orig, os.path.split(input_files[idat])[1])
-        else:
-            args.outfile = outfile_orig
+        args.outfile = _gridder_outfile(outfile_orig, input_files[idat], nof)
 
-        if len(out_lines) == 0:
+        if not keep.any():
             print("Error! Number of outputs is zero!")
             exit(1)
-        io.output_lines(out_lines, args)
+        io.write_column_lines(out_columns, row_fmt, args, names=out_names)
+
+#####################################################################
+
+def _gridder_relative_coords(points, point_app, deltaref, tazimref, circ):
+    # gridder relative coordinates (x, y arrays) of a PointArray: arc and
+    # azimuth differences from the reference point, as seen from point_app
+    # (differences wrapped to [-180, 180])
+    delta = points.calc_gcarc(point_app)
+    deltadiff = delta - deltaref
+    deltadiff = np.where(deltadiff > 180, deltadiff - 360,
+                         np.where(deltadiff < -180, deltadiff + 360, deltadiff))
+    tazdiff = tazimref - points.calc_az(point_app)
+    tazdiff = np.where(tazdiff > 180, tazdiff - 360,
+                       np.where(tazdiff < -180, tazdiff + 360, tazdiff))
+    return circ * deltadiff, circ * np.sin(np.radians(delta)) * tazdiff
+
+#####################################################################
+
+def _gridder_outfile(outfile_orig, input_file, nof):
+    # gridder output file of an input file (several input files: outfile is a folder)
+    if nof > 1 and outfile_orig:
+        if not os.path.isdir(outfile_orig):
+            os.mkdir(outfile_orig)
+        return os.path.join(outfile_orig, os.path.split(input_file)[1])
+    else:
+        return outfile_orig
+
+
+def _gridder_keep(gridx, gridy, gval, fmt, skipnan, polygons=None):
+    # boolean mask of grid points to output
+    keep = np.ones(len(gridx), dtype=bool)
+    if skipnan:
+        keep[np.isnan(gval).any(axis=0)] = False
+    if polygons is not None:
+        # point-in-polygon test is applied to the formatted coordinates
+        gridx_fmt = io.round_to_fmt(gridx, fmt[0])
+        gridy_fmt = io.round_to_fmt(gridy, fmt[0])
+        # grid points in any of the polygons
+        keep[~polygons.contains(gridx_fmt, gridy_fmt, 'union')] = False
+    return keep
+
+
+def _gridder_node_tiles(args, grid):
+    # grid nodes (gridx, gridy arrays) in tiles of about 'args.tile' nodes;
+    # grid: [minX, maxX, minY, maxY] (regular grid; tiles of whole columns of
+    # nodes with the same x) or [nodes_x, nodes_y] (nodes file)
+    if len(grid) == 2:
+        nodes_x = np.array(grid[0], dtype=float)
+        nodes_y = np.array(grid[1], dtype=float)
+        for i in range(0, len(nodes_x), args.tile):
+            yield nodes_x[i:i+args.tile], nodes_y[i:i+args.tile]
+        return
+    minX, maxX, minY, maxY = grid
+    nx, ny, ncols = _gridder_tile_shape(args, grid)
+    y = minY + np.arange(ny)*args.spacing[1]
+    for ix in range(0, nx, ncols):
+        x = minX + np.arange(ix, min(ix + ncols, nx))*args.spacing[0]
+        yield np.repeat(x, ny), np.tile(y, len(x))
+
+
+def _gridder_tile_shape(args, grid):
+    # regular grid of out-of-core gridding: number of nodes along x & y and
+    # number of node columns (same x) per tile
+    minX, maxX, minY, maxY = grid
+    nx = int(((maxX-minX)/args.spacing[0])+1)
+    ny = int(((maxY-minY)/args.spacing[1])+1)
+    return nx, ny, min(nx, max(1, args.tile // ny))
+
+
+def _gridder_tiles(args, input_file, outfile, fmt, grid, grid_tile, skipnan, polygons=None):
+    # out-of-core gridding of one input file: grid nodes are generated
+    # (_gridder_node_tiles), gridded (grid_tile(gridx, gridy) -> gval) and
+    # written tile by tile. Outputs: ascii lines in node order (unsorted;
+    # each tile is appended separately, so compressed outputs are allowed)
+    # or NetCDF ('.nc'; regular grids only) with NaN at skipped nodes.
+    # Completed tiles are recorded in '<outfile>.tiles' (tile count and
+    # output size) so that an interrupted run can be continued (args.resume);
+    # the run is identified by its arguments and the input file size & mtime
+    nvals = len(args.v)
+    is_nc = os.path.splitext(outfile)[1].lower() == '.nc'
+    if io.is_columnar(outfile):
+        print(f"Error! Out-of-core gridding ('tile') supports ascii and NetCDF ('.nc') outputs only.")
+        exit(1)
+    if is_nc and len(grid) == 2:
+        print(f"Error! NetCDF output of out-of-core gridding ('tile') requires a regular grid ('spacing').")
+        exit(1)
+    checkpoint = f"{outfile}.tiles"
+    signature = ' '.join([f"{x}" for x in ['gridder', os.path.abspath(input_file),
+                          os.path.getsize(input_file), os.path.getmtime(input_file),
+                          args.utm, args.spacing, args.nodes,
+                          args.smoothing, args.xrange, args.yrange, args.x, args.v, fmt,
+                          args.polygon, args.spherical, skipnan, args.tile]])
+    # completed tiles and output size (previous run)
+    ndone, size = 0, 0
+    if args.resume and os.path.isfile(checkpoint) and os.path.isfile(outfile):
+        with open(checkpoint, 'r') as fopen:
+            checkpoint_lines = fopen.read().splitlines()
+        if not len(checkpoint_lines) or checkpoint_lines[0] != signature:
+            print(f"Error! Could not resume: '{checkpoint}' belongs to a different gridding run.")
+            exit(1)
+        if len(checkpoint_lines) > 1:
+            ndone, size = [int(x) for x in checkpoint_lines[-1].split()]
+        if is_nc:
+            is_valid = _gridder_nc_matches(outfile, args, grid)
+        else:
+            is_valid = os.path.getsize(outfile) >= size
+        if not is_valid:
+            print(f"Error! Could not resume: '{outfile}' does not match '{checkpoint}'.")
+            exit(1)
+        print(f"Resuming after tile {ndone}: '{outfile}'")
+        if not is_nc:
+            # drop the lines of an incomplete tile
+            os.truncate(outfile, size)
+    else:
+        if is_nc:
+            _create_gridder_nc(outfile, args, grid)
+        else:
+            io.open_file(outfile, 'w').close()
+        with open(checkpoint, 'w') as fopen:
+            fopen.write(f"{signature}\n")
+    row_fmt = f"%{fmt[0]}f %{fmt[0]}f" + f" %{fmt[1]}f" * nvals
+    nout = 0
+    for itile, (gridx, gridy) in enumerate(_gridder_node_tiles(args, grid)):
+        if itile < ndone:
+            continue
+        gval = grid_tile(gridx, gridy)
+        keep = _gridder_keep(gridx, gridy, gval, fmt, skipnan, polygons)
+        if is_nc:
+            import netCDF4 as nc
+            gval[:, ~keep] = np.nan
+            # first node column of the tile
+            _, ny, ncols = _gridder_tile_shape(args, grid)
+            ix = itile * ncols
+            ds = nc.Dataset(outfile, mode='a')
+            for iv in range(nvals):
+                ds.variables[f"v{args.v[iv]}"][ix:ix+len(gridx)//ny, :] = gval[iv].reshape(-1, ny)
+            ds.close()
+        else:
+            fopen = io.open_file(outfile, 'a')
+            for block in io.format_column_blocks([col[keep] for col in [gridx, gridy, *gval]], row_fmt):
+                fopen.write(block)
+            fopen.close()
+        nout += np.sum(keep)
+        with open(checkpoint, 'a') as fopen:
+            fopen.write(f"{itile + 1} {0 if is_nc else os.path.getsize(outfile)}\n")
+    os.remove(checkpoint)
+    if nout == 0 and ndone == 0:
+        print("Error! Number of outputs is zero!")
+        exit(1)
+
+
+def _create_gridder_nc(outfile, args, grid):
+    # empty NetCDF file of out-of-core gridding: x & y axes and one
+    # (x, y) variable per value column, chunked like the node tiles
+    import netCDF4 as nc
+    minX, maxX, minY, maxY = grid
+    nx, ny, ncols = _gridder_tile_shape(args, grid)
+    ds = nc.Dataset(outfile, mode='w', format='NETCDF4_CLASSIC')
+    ds.createDimension('x', nx)
+    ds.createDimension('y', ny)
+    x = ds.createVariable('x', np.float64, ('x',))
+    y = ds.createVariable('y', np.float64, ('y',))
+    x.long_name = 'x'
+    y.long_name = 'y'
+    x[:] = minX + np.arange(nx)*args.spacing[0]
+    y[:] = minY + np.arange(ny)*args.spacing[1]
+    for iv in args.v:
+        v = ds.createVariable(f"v{iv}", np.float64, ('x', 'y',), chunksizes=(ncols, ny),
+                              fill_value=np.nan)
+        v.long_name = f"v{iv}"
+    ds.close()
+
+
+def _gridder_nc_matches(outfile, args, grid):
+    # is 'outfile' a NetCDF file of out-of-core gridding with this grid?
+    import netCDF4 as nc
+    minX, maxX, minY, maxY = grid
+    nx, ny, _ = _gridder_tile_shape(args, grid)
+    try:
+        ds = nc.Dataset(outfile, mode='r')
+    except Exception:
+        return False
+    try:
+        if ds.dimensions['x'].size != nx or ds.dimensions['y'].size != ny:
+            return False
+        if any(f"v{iv}" not in ds.variables for iv in args.v):
+            return False
+        return np.array_equal(ds.variables['x'][:], minX + np.arange(nx)*args.spacing[0]) \
+           and np.array_equal(ds.variables['y'][:], minY + np.arange(ny)*args.spacing[1])
+    except KeyError:
+        return False
+    finally:
+        ds.close()
+
+
+def _read_gridder_data(inpfile, args, fmt):
+    # gridder input: [[x, y], ...] and value columns without NaNs
+    pos, val, _ = io.read_numerical_columns(inpfile, args.header, args.footer,
+                                            args.x, args.v, skipnan=True, cache=args.cache,
+                                            noextra=True)
+    # same precision as the reformatted data lines
+    data_xy = io.round_to_fmt(pos, fmt[0]).T.tolist()
+    data_val = io.round_to_fmt(val, fmt[1]).tolist()
+    return [data_xy, data_val]
 
 #####################################################################
 
@@ -730,7 +909,7 @@ def gridder_utm(args):
         fmt = args.fmt
 
     if  args.nodes:
-        nodes_xy, _, _ = io.read_numerical_data(args.nodes, 0, 0, [".10",".10"], [1,2], [], skipnan=True)
+        nodes_xy, _, _ = io.read_numerical_data(args.nodes, 0, 0, [".10",".10"], [1,2], [], skipnan=True, noextra=True)
         nodes_x = nodes_xy[0]
         nodes_y = nodes_xy[1]
     else:
@@ -744,6 +923,14 @@ def gridder_utm(args):
         print(f"Error! 'smoothing' should be positive.")
         exit(1)
 
+    if args.tile is not None and args.tile < 1:
+        print(f"Error! 'tile' should be positive.")
+        exit(1)
+
+    if args.tile and not outfile_orig:
+        print(f"Error! Out-of-core gridding ('tile') requires an output file ('outfile').")
+        exit(1)
+
     if args.xrange[0] >= args.xrange[1]:
         print(f"Error! Argument 'xrange' should be entered in [min_x, max_x] format.")
         exit(1)
@@ -754,46 +941,25 @@ def gridder_utm(args):
 
     nof = len(args.input_files)
     input_files = args.input_files
-    datlines = [[] for i in range(nof)]
     data_xy = [[] for i in range(nof)]
     data_val = [[] for i in range(nof)]
     nvals = len(args.v)
-    for i in range(nof):
-        data_val[i] = [[] for iv in range(nvals)]
 
     # preprocessing: read data and omit NaNs
-    for i in range(nof):
-        datlines[i] = io.data_lines(input_files[i], args)
-        for line in datlines[i]:
-            xy = line.split()[0:len(args.x)]
-            vals = line.split()[len(args.x):len(args.x)+len(args.v)]
-            if 'nan' not in xy and 'nan' not in vals:
-                xy = np.array(xy, dtype=float).tolist()
-                data_xy[i].append(xy)
-                vals = np.array(vals, dtype=float).tolist()
-                for iv in range(nvals):
-                    data_val[i][iv].append(vals[iv])
+    for i, data in enumerate(io.imap_files(_read_gridder_data, input_files, args.jobs, args, fmt)):
+        data_xy[i], data_val[i] = data
 
     # point in polygon? If so, read polygon data & instantiate polygon object
     if args.polygon:
         polygon_file = args.polygon
         if os.path.splitext(polygon_file)[1] == ".shp":
             # if polygon_file is *.shp
-            import geopandas as gpd
-            from shapely.geometry import mapping
-            try:
-                shp = gpd.read_file(polygon_file)
-                polygon_x = np.array(mapping(shp)['features'][0]['geometry']['coordinates'][0]).flatten()[0::2]
-                polygon_y = np.array(mapping(shp)['features'][0]['geometry']['coordinates'][0]).flatten()[1::2]
-            except Exception as e:
-                print(f"Error reading shapefile! {e}")
-                exit(1)
+            polygons = io.read_polygon_shp_features(polygon_file)
         else:
             # else if polygon_file is not *.shp (ascii file)
             polygon_data = io.read_numerical_data(polygon_file, 0, 0, [".10",".10"], [1,2], [])
-            polygon_x = polygon_data[0][0]
-            polygon_y = polygon_data[0][1]
-        polygon = geographic.Polygon(polygon_x, polygon_y)
+            polygons = [[[polygon_data[0][0], polygon_data[0][1]]]]
+        polygons = geographic.PolygonCollection(polygons)
 
     # start main process
     # d: data, g: gridded
@@ -825,211 +991,221 @@ def gridder_utm(args):
             minY = args.yrange[0]
             maxY = args.yrange[1]
 
-        
-
-        ndp = len(dataX) # number of data points
-
         # input data relative coordinates: xnode & ynode
-        xnode = [];  ynode = []
-        for ip in range(ndp):
-            xnode.append(dataX[ip] - refX)
-            ynode.append(dataY[ip] - refY)
+        xnode = np.array(dataX, dtype=float) - refX
+        ynode = np.array(dataY, dtype=float) - refY
+
+        if args.tile:
+            # out-of-core gridding: nodes are generated, gridded and written tile by tile
+            def grid_tile(gridx, gridy):
+                return funcs.calc_grid_values(gridx - refX, gridy - refY, xnode, ynode, data_val[idat],
+                                              args.smoothing, jobs=args.jobs)
+            grid = [nodes_x, nodes_y] if args.nodes else [minX, maxX, minY, maxY]
+            _gridder_tiles(args, input_files[idat], _gridder_outfile(outfile_orig, input_files[idat], nof),
+                           fmt, grid, grid_tile, skipnan_orig, polygons if args.polygon else None)
+            continue
 
         # grid coordinates
-        gridx = []; gridy = []
-        rxgrid = [];  rygrid = []
         if args.nodes:
             ngp = len(nodes_x)
-            for ix, x in enumerate(nodes_x):
-                y = nodes_y[ix]
-                gridx.append(x)
-                gridy.append(y)
-                rxgrid.append(x - refX)
-                rygrid.append(y - refY)
+            gridx = np.array(nodes_x, dtype=float)
+            gridy = np.array(nodes_y, dtype=float)
         else:
             xinc = args.spacing[0]
             yinc = args.spacing[1]
             nx = int(((maxX-minX)/xinc)+1)
             ny = int(((maxY-minY)/yinc)+1)
             ngp = nx * ny # number of grid points
-            for ix in range(nx):
-                x = minX + ix*xinc
-                for iy in range(ny):
-                    y = minY + iy*yinc
-                    gridx.append(x)
-                    gridy.append(y)
-                    rxgrid.append(x - refX)
-                    rygrid.append(y - refY)
-
-        # gridding 
-        out_lines = []
-        gval = [np.zeros(ngp).tolist() for x in range(nvals)]
-        for igp in range(ngp):
-            line = f"%{fmt[0]}f %{fmt[0]}f" %(gridx[igp], gridy[igp])
-            xnode = np.array(xnode)
-            ynode = np.array(ynode)
-            wgt = funcs.calc_wgt(rxgrid[igp], rygrid[igp], xnode, ynode, args.smoothing)
-            wgtsum = np.sum(wgt)
-
-            for iv in range(nvals):
-
-                with warnings.catch_warnings():
-                    warnings.simplefilter('ignore')
-                    gval[iv][igp] += np.sum(wgt * np.array(data_val[idat][iv])) / wgtsum
-
-                line = f"{line} %{fmt[1]}f" %(gval[iv][igp])
-
-            point = geographic.Point(float(line.split()[0]), float(line.split()[1]))
-
-            if skipnan_orig:
-                if 'nan' not in line.split():
-                    if args.polygon:
-                        if polygon.is_point_in(point):
-                            out_lines.append(line)
-                    else:
-                        out_lines.append(line)
-            else:
-                if args.polygon:
-                    if polygon.is_point_in(point):
-                        out_lines.append(line)
-                else:
-                    out_lines.append(line)
+            # x varies slowest, then y
+            gridx = np.repeat(minX + np.arange(nx)*xinc, ny)
+            gridy = np.tile(minY + np.arange(ny)*yinc, nx)
+        rxgrid = gridx - refX
+        rygrid = gridy - refY
+
+        # gridding: tiles of grid points against their nearby data points
+        gval = funcs.calc_grid_values(rxgrid, rygrid, xnode, ynode, data_val[idat], args.smoothing,
+                                      jobs=args.jobs)
+
+        # grid points to output
+        keep = _gridder_keep(gridx, gridy, gval, fmt, skipnan_orig,
+                             polygons if args.polygon else None)
+        out_columns = [col[keep] for col in [gridx, gridy, *gval]]
+        out_names = ['x', 'y'] + [f"v{iv}" for iv in args.v]
+        row_fmt = f"%{fmt[0]}f %{fmt[0]}f" + f" %{fmt[1]}f" * nvals
 
         # output results
         args.append = False
         args.sort = True
         args.uniq = False
 
-        if nof > 1 and outfile_orig:
-            if not os.path.isdir(outfile_orig):
-                os.mkdir(outfile_orig)
-            args.outfile = os.path.join(outfile_orig, os.path.split(input_files[idat])[1])
-        else:
-            args.outfile = outfile_orig
+        args.outfile = _gridder_outfile(outfile_orig, input_files[idat], nof)
 
-        if len(out_lines) == 0:
+        if not keep.any():
             print("Error! Number of outputs is zero!")
             exit(1)
-        io.output_lines(out_lines, args)
+        io.write_column_lines(out_columns, row_fmt, args, names=out_names)
 
 #####################################################################
 
 def union(args):
     nof = len(args.input_files)
     input_files = args.input_files
-    datlines = [[] for i in range(nof)]
-    datlines_pos = [[] for i in range(nof)]
     if nof < 2:
         print("Error! Number of input_files should be larger than 2 for this operation.")
         exit(1)
-    for i in range(nof):
-        datlines[i] = io.data_lines(input_files[i], args)
-        for line in datlines[i]:
-            datlines_pos[i].append(' '.join(line.split()[0:len(args.x)]))
-    union = []
-    union_pos = []
-    for i in range(nof):
-        nol = len(datlines_pos[i])
-        for j in range(nol):
-            if datlines_pos[i][j] not in union_pos:
-                union.append(datlines[i][j])
-                union_pos.append(datlines_pos[i][j])
-    if args.inverse:
-        union_inv = []
-        for i in range(nof):
-            nol = len(datlines[i])
-            for j in range(nol):
-                if datlines[i][j] not in union:
-                    union_inv.append(datlines[i][j])
-        if len(union_inv) == 0:
-            print("Error! Number of outputs is zero!")
-            exit(1)
-        io.output_lines(union_inv, args)
+    if args.presorted:
+        union = presorted_set_operation(input_files, args, len(args.x), 'union', args.inverse)
     else:
-        if len(union) == 0:
-            print("Error! Number of outputs is zero!")
-            exit(1)
-        io.output_lines(union, args)
+        datlines = list(io.imap_files(io.data_lines, input_files, args.jobs, args))
+        union = positional_set_operation(datlines, len(args.x), 'union', args.inverse)
+    union = nonempty_lines(union, "Error! Number of outputs is zero!")
+    io.output_lines(union, args)
 
 #####################################################################
 
 def intersect(args):
     nof = len(args.input_files)
     input_files = args.input_files
-    datlines = [[] for i in range(nof)]
-    datlines_pos = [[] for i in range(nof)]
     if nof < 2:
         print("Error! Number of input_files should be larger than 2 for this operation.")
         exit(1)
-    for i in range(nof):
-        datlines[i] = io.data_lines(input_files[i], args)
-        for line in datlines[i]:
-            datlines_pos[i].append(' '.join(line.split()[0:len(args.x)]))
-    intersect = []
-    intersect_pos = []
-    nol = len(datlines[0])
-    for j in range(nol):
-        if all(datlines_pos[0][j] in l for l in datlines_pos[1:])\
-        and datlines_pos[i][j] not in intersect_pos:
-            intersect.append(datlines[0][j])
-            intersect_pos.append(datlines_pos[0][j])
-    if args.inverse:
-        intersect_inv = []
-        for i in range(nof):
-            nol = len(datlines[i])
-            for j in range(nol):
-                line = datlines[i][j]
-                if line not in intersect:
-                    intersect_inv.append(line)
-        if len(intersect_inv) == 0:
-            print("Error! Number of outputs is zero!")
+    if args.presorted:
+        if args.tolerance > 0:
+            print("Error! Argument '--tolerance' is not supported with '--presorted'.")
             exit(1)
-        io.output_lines(intersect_inv, args)
+        intersect = presorted_set_operation(input_files, args, len(args.x), 'intersect', args.inverse)
     else:
-        if len(intersect) == 0:
-            print("Error! Number of outputs is zero!")
-            exit(1)
-        io.output_lines(intersect, args)
+        datlines = list(io.imap_files(io.data_lines, input_files, args.jobs, args))
+        intersect = positional_set_operation(datlines, len(args.x), 'intersect', args.inverse, args.tolerance)
+    intersect = nonempty_lines(intersect, "Error! Number of outputs is zero!")
+    io.output_lines(intersect, args)
 
 #####################################################################
 
 def difference(args):
     nof = len(args.input_files)
     input_files = args.input_files
-    datlines = [[] for i in range(nof)]
-    datlines_pos = [[] for i in range(nof)]
     if nof < 2:
         print("Error! Number of input_files should be larger than 2 for this operation.")
         exit(1)
-    for i in range(nof):
-        datlines[i] = io.data_lines(input_files[i], args)
-        for line in datlines[i]:
-            datlines_pos[i].append(' '.join(line.split()[0:len(args.x)]))
-    difference = []
-    difference_pos = []
-    nol = len(datlines[0])
-    for j in range(nol):
-        if all(datlines_pos[0][j] not in l for l in datlines_pos[1:])\
-        and datlines_pos[0][j] not in difference_pos:
-            difference.append(datlines[0][j])
-            difference_pos.append(datlines_pos[0][j])
-    if args.inverse:
-        difference_inv = []
-        for i in range(nof):
-            nol = len(datlines[i])
-            for j in range(nol):
-                line = datlines[i][j]
-                if line not in difference:
-                    difference_inv.append(line)
-        if len(difference_inv) == 0:
-            print("Error! Number of outputs is zero!")
+    if args.presorted:
+        if args.tolerance > 0:
+            print("Error! Argument '--tolerance' is not supported with '--presorted'.")
             exit(1)
-        io.output_lines(difference_inv, args)
+        difference = presorted_set_operation(input_files, args, len(args.x), 'difference', args.inverse)
     else:
-        if len(difference) == 0:
-            print("Error! Number of outputs is zero!")
+        datlines = list(io.imap_files(io.data_lines, input_files, args.jobs, args))
+        difference = positional_set_operation(datlines, len(args.x), 'difference', args.inverse, args.tolerance)
+    difference = nonempty_lines(difference, "Error! Number of outputs is zero!")
+    io.output_lines(difference, args)
+
+
+def positional_set_operation(datlines, npos, operation, inverse=False, tolerance=0):
+    # union/intersect/difference of data lines (datlines: list of lines of
+    # each file) by their first 'npos' (positional) columns; the first line
+    # of each position is kept. inverse=True: lines that are not in the result.
+    # Positions are hashed, i.e. one linear pass over the lines of each file;
+    # tolerance > 0 (intersect/difference): positions within 'tolerance' match
+    from itertools import chain
+    datlines_pos = [[' '.join(line.split()[0:npos]) for line in lines] for lines in datlines]
+    if operation == 'union':
+        candidates = zip(chain(*datlines), chain(*datlines_pos))
+    else:
+        candidates = zip(datlines[0], datlines_pos[0])
+        if tolerance > 0:
+            matched = (match_positions(datlines, npos, tolerance)[1:] >= 0)
+            in_all = iter(matched.all(axis=0))
+            in_any = iter(matched.any(axis=0))
+        else:
+            other_pos = [set(pos) for pos in datlines_pos[1:]]
+    result = []
+    result_pos = set()
+    for line, pos in candidates:
+        if operation != 'union' and tolerance > 0:
+            keep = next(in_all) if operation == 'intersect' else not next(in_any)
+        elif operation == 'intersect':
+            keep = all(pos in s for s in other_pos)
+        elif operation == 'difference':
+            keep = not any(pos in s for s in other_pos)
+        else:
+            keep = True
+        if not keep or pos in result_pos:
+            continue
+        result.append(line)
+        result_pos.add(pos)
+    if inverse:
+        result_lines = set(result)
+        result = [line for line in chain(*datlines) if line not in result_lines]
+    return result
+
+
+def presorted_set_operation(input_files, args, npos, operation, inverse=False):
+    # streaming positional_set_operation for input files that are sorted by
+    # position (yields output lines in position order); only the lines at
+    # the current position of each file are held in memory
+    for pos, groups in merge_position_groups(input_files, args, npos):
+        if operation == 'union':
+            keep = True
+        elif groups[0] is None:
+            keep = False
+        elif operation == 'intersect':
+            keep = all(lines is not None for lines in groups[1:])
+        else:
+            keep = all(lines is None for lines in groups[1:])
+        if keep:
+            result = next(lines for lines in groups if lines is not None)[0]
+        else:
+            result = None
+        if inverse:
+            for lines in groups:
+                for line in lines or []:
+                    if line != result:
+                        yield line
+        elif keep:
+            yield result
+
+
+def merge_position_groups(input_files, args, npos):
+    # k-way merge of position-sorted data files: yields (pos, groups) for every
+    # position in ascending order; groups[i]: lines of the i-th file at this
+    # position (None if the position is not in the i-th file)
+    import heapq
+    from itertools import groupby
+    def file_groups(i, datfile):
+        for pos, lines in iter_position_groups(datfile, args, npos):
+            yield pos, i, lines
+    merged = heapq.merge(*[file_groups(i, datfile) for i, datfile in enumerate(input_files)])
+    for pos, items in groupby(merged, key=lambda x: x[0]):
+        groups = [None for i in range(len(input_files))]
+        for _, i, lines in items:
+            groups[i] = lines
+        yield pos, groups
+
+
+def iter_position_groups(datfile, args, npos):
+    # consecutive data lines of a position-sorted file grouped by their
+    # first 'npos' columns: yields (pos, lines). Positions are compared as
+    # text, the order of --sort outputs
+    from itertools import groupby
+    previous = None
+    lines = ((' '.join(line.split()[0:npos]), line) for line in io.iter_data_lines(datfile, args))
+    for pos, group in groupby(lines, key=lambda x: x[0]):
+        if previous is not None and pos < previous:
+            print(f"Error! Input file is not sorted by position (as text): '{datfile}'")
             exit(1)
-        io.output_lines(difference, args)
+        previous = pos
+        yield pos, [line for _, line in group]
+
+
+def nonempty_lines(lines, error_message):
+    # output lines (could be a generator); exits if there are no lines
+    from itertools import chain
+    lines = iter(lines)
+    first = next(lines, None)
+    if first is None:
+        print(error_message)
+        exit(1)
+    return chain([first], lines)
 
 #####################################################################
 
@@ -1151,43 +1327,30 @@ def points_in_polygon(args):
 
         polygon_x = [args.xrange[0], args.xrange[1], args.xrange[1], args.xrange[0], args.xrange[0]]
         polygon_y = [args.yrange[0], args.yrange[0], args.yrange[1], args.yrange[1], args.yrange[0]]
-        polygons = [[polygon_x, polygon_y]]
+        polygons = [[[polygon_x, polygon_y]]]
     elif args.polygon:
         polygon_file = args.polygon
         if os.path.splitext(polygon_file)[1] == ".shp":
             # if polygon_file is *.shp
-            polygons = io.read_polygon_shp(polygon_file)
+            polygons = io.read_polygon_shp_features(polygon_file)
         else:
             # else if polygon_file is not *.shp (ascii file)
             polygon_data = io.read_numerical_data(polygon_file, 0, 0, [".10",".10"], args.x, [])
             polygon_x = polygon_data[0][0]
             polygon_y = polygon_data[0][1]
-            polygons = [[polygon_x, polygon_y]]
+            polygons = [[[polygon_x, polygon_y]]]
     
     if not len(polygons):
         print(f"Error: polygon is not specified. Please use either '--xrange & --yrange' or '--polygon'.")
         exit(1)
 
     # main process
-    if len(polygons) > 1 and args.inverse:
-        print("Error! 'inverse' cannot be enabled if two or more polygons are given!")
-        exit(1)
-
-    for points_file in args.points:
-        if os.path.splitext(points_file)[1] == ".shp":
-            print("In this version of gdp and this tool, shape files are not accepted for points. Use ascii instead!")
-            exit()
-        else:
-            points_data = io.read_numerical_data(points_file, args.header, args.footer,  [".10",".10"], args.x, [])
-            nop = len(points_data[0][0]) # number of points
-        if nop:
-            outdata_lines = []
-            for ip in range(nop):
-                point = geographic.Point(points_data[0][0][ip], points_data[0][1][ip])
-                for iply in range(len(polygons)):
-                    polygon = geographic.Polygon(polygons[iply][0], polygons[iply][1])
-                    if polygon.is_point_in(point, args.inverse):
-                        outdata_lines.append(f"%f %f %s" %(point.lon, point.lat, points_data[2][ip]))
+    # polygons are prepared once for all points files; points in any of the
+    # polygons are output (inverse: points that are not in any polygon)
+    polygons = geographic.PolygonCollection(polygons, spherical=args.spherical)
+    results = io.imap_files(_points_in_polygon_lines, args.points, args.jobs, args, polygons)
+    for points_file, outdata_lines in zip(args.points, results):
+        if outdata_lines != None:
             if len(args.points) > 1:
                 if args.outfile:
                     if not os.path.isdir(outfile_orig):
@@ -1223,18 +1386,43 @@ def points_in_polygon(args):
             print("Warning! No points in polygon.")
 
 
+def _points_in_polygon_lines(points_file, args, polygons):
+    # output lines of points (in/out of polygons) for one points file;
+    # returns None if there are no points; polygons: PolygonCollection
+    if os.path.splitext(points_file)[1] == ".shp":
+        print("In this version of gdp and this tool, shape files are not accepted for points. Use ascii instead!")
+        exit()
+    else:
+        points_data = io.read_numerical_data(points_file, args.header, args.footer,  [".10",".10"], args.x, [], cache=args.cache)
+        nop = len(points_data[0][0]) # number of points
+    if not nop:
+        return None
+    # points in any of the polygons
+    is_in = polygons.contains(points_data[0][0], points_data[0][1], 'union')
+    if args.inverse:
+        is_in = ~is_in
+    outdata_lines = []
+    for ip in np.flatnonzero(is_in):
+        outdata_lines.append(f"%f %f %s" %(points_data[0][0][ip], points_data[0][1][ip], points_data[2][ip]))
+    return outdata_lines
+
+
 #####################################################################
 
 
+def _calc_stat_line(inpfile, args, stat):
+    # output line of 'stats' commands: input file and 'stat' (name of a
+    # numpy function e.g. 'nanmin') of every value column
+    calc_stat = getattr(np, stat)
+    stat_column = []
+    data = io.read_numerical_data(inpfile, args.header, args.footer,  [f".{args.decimal[0]}"], [], args.v, cache=args.cache, noextra=True)
+    for col in data[1]:
+        stat_column.append(f"%.{args.decimal[0]}f" %(float(calc_stat(col))))
+    return ' '.join([inpfile] + stat_column)
+
+
 def calc_min(args):
-    from numpy import nanmin
-    outdata_lines = []
-    for inpfile in args.input_files:
-        min_column = []
-        data = io.read_numerical_data(inpfile, args.header, args.footer,  [f".{args.decimal[0]}"], [], args.v)
-        for col in data[1]:
-            min_column.append(f"%.{args.decimal[0]}f" %(nanmin(col)))
-        outdata_lines.append(' '.join([inpfile] + min_column))
+    outdata_lines = list(io.imap_files(_calc_stat_line, args.input_files, args.jobs, args, 'nanmin'))
     args.sort = False
     args.uniq = False
     if len(outdata_lines) == 0:
@@ -1247,14 +1435,7 @@ def calc_min(args):
 
 
 def calc_max(args):
-    from numpy import nanmax
-    outdata_lines = []
-    for inpfile in args.input_files:
-        max_column = []
-        data = io.read_numerical_data(inpfile, args.header, args.footer,  [f".{args.decimal[0]}"], [], args.v)
-        for col in data[1]:
-            max_column.append(f"%.{args.decimal[0]}f" %(nanmax(col)))
-        outdata_lines.append(' '.join([inpfile] + max_column))
+    outdata_lines = list(io.imap_files(_calc_stat_line, args.input_files, args.jobs, args, 'nanmax'))
     args.sort = False
     args.uniq = False
     if len(outdata_lines) == 0:
@@ -1267,14 +1448,7 @@ def calc_max(args):
 
 
 def calc_sum(args):
-    from numpy import nansum
-    outdata_lines = []
-    for inpfile in args.input_files:
-        sum_column = []
-        data = io.read_numerical_data(inpfile, args.header, args.footer,  [f".{args.decimal[0]}"], [], args.v)
-        for col in data[1]:
-            sum_column.append(f"%.{args.decimal[0]}f" %(nansum(col)))
-        outdata_lines.append(' '.join([inpfile] + sum_column))
+    outdata_lines = list(io.imap_files(_calc_stat_line, args.input_files, args.jobs, args, 'nansum'))
     args.sort = False
     args.uniq = False
     if len(outdata_lines) == 0:
@@ -1285,14 +1459,7 @@ def calc_sum(args):
 #####################################################################
 
 def calc_mean(args):
-    from numpy import nanmean
-    outdata_lines = []
-    for inpfile in args.input_files:
-        mean_column = []
-        data = io.read_numerical_data(inpfile, args.header, args.footer,  [f".{args.decimal[0]}"], [], args.v)
-        for col in data[1]:
-            mean_column.append(f"%.{args.decimal[0]}f" %(float(nanmean(col))))
-        outdata_lines.append(' '.join([inpfile] + mean_column))
+    outdata_lines = list(io.imap_files(_calc_stat_line, args.input_files, args.jobs, args, 'nanmean'))
     args.sort = False
     args.uniq = False
     if len(outdata_lines) == 0:
@@ -1304,14 +1471,7 @@ def calc_mean(args):
 
 
 def calc_median(args):
-    from numpy import nanmedian
-    outdata_lines = []
-    for inpfile in args.input_files:
-        median_column = []
-        data = io.read_numerical_data(inpfile, args.header, args.footer,  [f".{args.decimal[0]}"], [], args.v)
-        for col in data[1]:
-            median_column.append(f"%.{args.decimal[0]}f" %(float(nanmedian(col))))
-        outdata_lines.append(' '.join([inpfile] + median_column))
+    outdata_lines = list(io.imap_files(_calc_stat_line, args.input_files, args.jobs, args, 'nanmedian'))
     args.sort = False
     args.uniq = False
     if len(outdata_lines) == 0:
@@ -1322,14 +1482,7 @@ def calc_median(args):
 #####################################################################
 
 def calc_std(args):
-    from numpy import nanstd
-    outdata_lines = []
-    for inpfile in args.input_files:
-        std_column = []
-        data = io.read_numerical_data(inpfile, args.header, args.footer,  [f".{args.decimal[0]}"], [], args.v)
-        for col in data[1]:
-            std_column.append(f"%.{args.decimal[0]}f" %(nanstd(col)))
-        outdata_lines.append(' '.join([inpfile] + std_column))
+    outdata_lines = list(io.imap_files(_calc_stat_line, args.input_files, args.jobs, args, 'nanstd'))
     args.sort = False
     args.uniq = False
     if len(outdata_lines) == 0:
@@ -25,6 +25,84 @@ def calc_wgt(xg, yg, xnode, ynode, smoothing):
     return wgt
 
 
+def calc_grid_values(xg, yg, xnode, ynode, values, smoothing, tile_size=1024, block=2**22, jobs=1):
+    # Gaussian-weighted averages (nvals x ngp) of data values (nvals x ndp) at
+    # grid points (xg, yg). calc_wgt weights are zero unless
+    # alpha * distance**2 < smoothing, so only the data points (xnode, ynode)
+    # within that radius of a tile of grid points (grid_tiles) are used; they
+    # are found with a KD-tree. The weights of a tile are computed as a 2-D
+    # array of at most 'block' elements (larger tiles are split into chunks)
+    # and all value columns are reduced in one matrix product. With jobs > 1,
+    # groups of tiles are gridded by a pool of processes (same results)
+    from . import io
+    xg = np.asarray(xg, dtype=float)
+    yg = np.asarray(yg, dtype=float)
+    xnode = np.asarray(xnode, dtype=float)
+    ynode = np.asarray(ynode, dtype=float)
+    values = np.asarray(values, dtype=float).reshape(-1, len(xnode))
+    gval = np.full((len(values), len(xg)), np.nan)
+    if len(xg) == 0 or len(xnode) == 0:
+        return gval
+    tiles = grid_tiles(xg, yg, tile_size)
+    # tasks: groups of consecutive tiles (a few per process)
+    ntasks = min(len(tiles), 4 * jobs) if jobs > 1 else 1
+    bounds = np.linspace(0, len(tiles), ntasks + 1).astype(int)
+    tasks = [tiles[bounds[i]:bounds[i+1]] for i in range(ntasks)]
+    arrays = {'xg': xg, 'yg': yg, 'xnode': xnode, 'ynode': ynode, 'values': values}
+    results = io.imap_shared(_grid_tiles_values, tasks, arrays, jobs, smoothing, block)
+    for task, tiles_gval in zip(tasks, results):
+        for tile, tile_gval in zip(task, tiles_gval):
+            gval[:, tile] = tile_gval
+    return gval
+
+
+def _grid_tiles_values(tiles, arrays, smoothing, block):
+    # calc_grid_values of a group of tiles: list of (nvals x tile size) arrays
+    from scipy.spatial import cKDTree
+    xg, yg = arrays['xg'], arrays['yg']
+    xnode, ynode, values = arrays['xnode'], arrays['ynode'], arrays['values']
+    alpha = 1 / (smoothing ** 2)
+    radius = smoothing ** 1.5 * (1 + 1e-9)
+    tree = cKDTree(np.column_stack([xnode, ynode]))
+    tiles_gval = []
+    for tile in tiles:
+        # data points within the radius of any grid point of the tile
+        xmin, xmax = xg[tile].min(), xg[tile].max()
+        ymin, ymax = yg[tile].min(), yg[tile].max()
+        half_diagonal = np.hypot(xmax - xmin, ymax - ymin) / 2
+        near = tree.query_ball_point([(xmin + xmax) / 2, (ymin + ymax) / 2],
+                                     radius + half_diagonal, return_sorted=True)
+        near = np.array(near, dtype=int)
+        xnear, ynear, vnear = xnode[near], ynode[near], values[:, near]
+        tile_gval = np.zeros((len(values), len(tile)))
+        nchunk = max(1, block // max(1, len(near)))
+        for ic in range(0, len(tile), nchunk):
+            igp = tile[ic:ic+nchunk]
+            adistsq = alpha * ((xg[igp, None] - xnear)**2 + (yg[igp, None] - ynear)**2)
+            wgt = np.where(adistsq < smoothing, np.exp(-adistsq), 0)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                tile_gval[:, ic:ic+nchunk] = (vnear @ wgt.T) / np.sum(wgt, axis=1)
+        tiles_gval.append(tile_gval)
+    return tiles_gval
+
+
+def grid_tiles(xg, yg, tile_size=1024):
+    # grid point indices in spatial tiles of about 'tile_size' points: the
+    # bounding box of the points is split into a regular grid of cells
+    xg = np.asarray(xg, dtype=float)
+    yg = np.asarray(yg, dtype=float)
+    ntiles = int(np.ceil(np.sqrt(len(xg) / tile_size)))
+    cell = np.zeros(len(xg), dtype=int)
+    for coord in [xg, yg]:
+        cmin, cmax = coord.min(), coord.max()
+        icell = np.zeros(len(coord), dtype=int) if cmax == cmin \
+                else np.minimum((coord - cmin) / (cmax - cmin) * ntiles, ntiles - 1).astype(int)
+        cell = cell * ntiles + icell
+    order = np.argsort(cell, kind='stable')
+    tile_start = np.flatnonzero(np.diff(cell[order], prepend=-1))
+    return np.split(order, tile_start[1:])
+
+
 # Bezier smoothing from:
 # https://towardsdatascience.com/b%C3%A9zier-interpolation-8033e9a262c2
 
@@ -133,3 +211,25 @@ def get_grid_value(x, y, data_x, data_y, data_val, smoothing):
     node_weights = gridder_node_weights(x, y, data_x_win, data_y_win, smoothing)
     node_val = gridder_node_value(node_weights, data_val_win)
     return node_val
+
+#-------------------------#
+def get_grid_values(x, y, data_x, data_y, data_val, smoothing, jobs=1, chunksize=1024):
+    # get_grid_value for all nodes (x, y); smoothing: one value or one per
+    # node. With jobs > 1, chunks of nodes are processed by a pool of processes
+    from . import io
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    smoothing = np.broadcast_to(np.asarray(smoothing, dtype=float), x.shape)
+    arrays = {'x': x, 'y': y, 'smoothing': smoothing,
+              'data_x': np.asarray(data_x, dtype=float),
+              'data_y': np.asarray(data_y, dtype=float),
+              'data_val': np.asarray(data_val, dtype=float)}
+    tasks = [(i, min(i + chunksize, len(x))) for i in range(0, len(x), chunksize)]
+    node_vals = []
+    for chunk_vals in io.imap_shared(_get_grid_values_chunk, tasks, arrays, jobs):
+        node_vals += chunk_vals
+    return node_vals
+
+def _get_grid_values_chunk(task, arrays):
+    return [get_grid_value(arrays['x'][i], arrays['y'][i], arrays['data_x'], arrays['data_y'],
+                           arrays['data_val'], arrays['smoothing'][i]) for i in range(*task)]
@@ -1,19 +1,63 @@
 #!/usr/bin/env python3
 
+from math import sin, cos, atan2, radians, degrees, sqrt
+import numpy as np
+
 class Point:
+    __slots__ = ('lon', 'lat')
+
     def __init__(self, lon, lat):
         self.lon = lon
         self.lat = lat
 
 
+class PointArray:
+    # struct-of-arrays storage of many points (lon & lat float64 arrays)
+    # to be used instead of lists of Point objects
+    __slots__ = ('lon', 'lat')
+
+    def __init__(self, lon, lat):
+        self.lon = np.asarray(lon, dtype=float).ravel()
+        self.lat = np.asarray(lat, dtype=float).ravel()
+        if len(self.lon) != len(self.lat):
+            print(f"Error in class PointArray! Number of lon and lat values must be the same.\n")
+            exit(1)
+
+    def __len__(self):
+        return len(self.lon)
+
+    def __getitem__(self, i):
+        return Point(float(self.lon[i]), float(self.lat[i]))
+
+    def calc_gcarc(self, point):
+        # great-circle arcs (degrees) from 'point' to all points
+        return calc_gcarc(point.lon, point.lat, self.lon, self.lat)
+
+    def calc_az(self, point):
+        # azimuths (degrees) from 'point' to all points
+        return calc_az(point.lon, point.lat, self.lon, self.lat)
+
+    def is_in(self, polygon, inverse=False):
+        # boolean mask of points in 'polygon' (Polygon, PreparedPolygon or PolygonCollection)
+        if isinstance(polygon, Polygon):
+            return polygon.is_points_in(self.lon, self.lat, inverse)
+        is_in = polygon.contains(self.lon, self.lat)
+        if inverse:
+            return ~is_in
+        else:
+            return is_in
+
 
 class Line:
+    __slots__ = ('point1', 'point2')
+
     def __init__(self, point1, point2):
         self.point1 = point1
         self.point2 = point2
 
     def calc_gcarc(self):
-        from math import sin, cos, atan2, radians, degrees, sqrt
+        if not _is_scalar_line(self):
+            return calc_gcarc(self.point1.lon, self.point1.lat, self.point2.lon, self.point2.lat)
         lon1, lat1 = radians(self.point1.lon), radians(self.point1.lat)
         lon2, lat2 = radians(self.point2.lon), radians(self.point2.lat)
         delta_lon = lon2 - lon1
@@ -23,7 +67,8 @@ class Line:
         return degrees(gcarc)
 
     def calc_dist(self):
-        from math import sin, cos, radians, sqrt
+        if not _is_scalar_line(self):
+            return calc_dist(self.point1.lon, self.point1.lat, self.point2.lon, self.point2.lat)
         # calculate earth radius at mid_latitude first
         # formula from https://rechneronline.de/earth-radius/
         mid_lat = radians((self.point1.lat + self.point2.lat) / 2)
@@ -39,7 +84,8 @@ class Line:
         return dist
 
     def calc_az(self):
-        from math import sin, cos, atan2, radians, degrees
+        if not _is_scalar_line(self):
+            return calc_az(self.point1.lon, self.point1.lat, self.point2.lon, self.point2.lat)
         lon1, lat1 = radians(self.point1.lon), radians(self.point1.lat)
         lon2, lat2 = radians(self.point2.lon), radians(self.point2.lat)
         delta_lon = lon2 - lon1
@@ -51,7 +97,8 @@ class Line:
         return az
 
     def calc_baz(self):
-        from math import sin, cos, atan2, radians, degrees
+        if not _is_scalar_line(self):
+            return calc_baz(self.point1.lon, self.point1.lat, self.point2.lon, self.point2.lat)
         lon1, lat1 = radians(self.point2.lon), radians(self.point2.lat)
         lon2, lat2 = radians(self.point1.lon), radians(self.point1.lat)
         delta_lon = lon2 - lon1
@@ -73,6 +120,8 @@ class Line:
 
 
 class Polygon:
+    __slots__ = ('lon', 'lat', '_prepared')
+
     def __init__(self, polygon_lon, polygon_lat):
         self.lon = polygon_lon
         self.lat = polygon_lat
@@ -90,53 +139,476 @@ class Polygon:
         return lines
 
     def is_point_in(self, point, inverse=False):
-        lon_range = [min(self.lon), max(self.lon)]
-        lat_range = [min(self.lat), max(self.lat)]
-        if point.lon < lon_range[0] or point.lon > lon_range[1] or point.lat < lat_range[0] or point.lat > lat_range[1]:
-            if inverse:
-                return True
-            else:
-                return False
+        return bool(self.is_points_in([point.lon], [point.lat], inverse)[0])
+
+    def is_points_in(self, lon, lat, inverse=False):
+        # vectorized is_point_in: boolean mask of points (lon, lat arrays)
+        is_in = self.prepared().contains(lon, lat)
+        if inverse:
+            return ~is_in
         else:
-            pass
-            dlon = (lon_range[1] - lon_range[0]) / 10
-            dlat = (lat_range[1] - lat_range[0]) / 10
-            point_north = Point(point.lon, lat_range[1]+dlat)
-            point_south = Point(point.lon, lat_range[0]-dlat)
-            point_east = Point(lon_range[1]+dlon, point.lat)
-            point_west = Point(lon_range[0]-dlon, point.lat)
-            test_lines = [Line(point, point_north),
-                          Line(point, point_south),
-                          Line(point, point_east),
-                          Line(point, point_west)] # four crossing lines
-            for test_line in test_lines:
-                num_intersects = 0
-                for line in self.get_lines():
-                    if line.is_intersect_line(test_line):
-                        num_intersects += 1
-                if num_intersects: # no need to test other crossing lines
-                    break
-            if inverse:
-                if num_intersects % 2:
-                    return False
-                else:
-                    return True
-            else:
-                if num_intersects % 2:
-                    return True
-                else:
-                    return False
+            return is_in
+
+    def prepared(self):
+        # PreparedPolygon of this polygon (built once)
+        if getattr(self, '_prepared', None) is None:
+            self._prepared = PreparedPolygon(self.lon, self.lat)
+        return self._prepared
+
+
+class PreparedPolygon:
+    # polygon prepared for repeated point-in-polygon tests: vertex and edge
+    # arrays, the bounding box and the latitude range (slab) of every edge
+    __slots__ = ('lon', 'lat', 'bbox', 'x1', 'y1', 'dx', 'dy', 'xmin', 'xmax', 'ymin', 'ymax')
+
+    def __init__(self, polygon_lon, polygon_lat):
+        lon = np.asarray(polygon_lon, dtype=float)
+        lat = np.asarray(polygon_lat, dtype=float)
+        if lon[0] != lon[-1] or lat[0] != lat[-1]:
+            print(f"Error in class PreparedPolygon! The first and last points must be the same (closed polygon).\n")
+            exit(1)
+        self.lon = lon
+        self.lat = lat
+        self.bbox = [lon.min(), lon.max(), lat.min(), lat.max()]
+        self.x1, self.y1 = lon[:-1], lat[:-1]
+        self.dx, self.dy = lon[1:] - lon[:-1], lat[1:] - lat[:-1]
+        self.xmin, self.xmax = np.minimum(lon[:-1], lon[1:]), np.maximum(lon[:-1], lon[1:])
+        self.ymin, self.ymax = np.minimum(lat[:-1], lat[1:]), np.maximum(lat[:-1], lat[1:])
+
+    def contains(self, lon, lat):
+        # boolean mask (same shape as lon) of points inside the polygon or on its edges
+        crossings, on_edge = self.crossings(lon, lat)
+        return crossings | on_edge
+
+    def crossings(self, lon, lat):
+        # crossing-number test: masks (same shape as lon) of points with an
+        # odd number of crossings of a ray towards +lon, and of points on
+        # the edges. Points are sorted by latitude so that every edge only
+        # touches the points within its slab
+        lon = np.asarray(lon, dtype=float)
+        lat = np.asarray(lat, dtype=float)
+        lon_flat = lon.ravel()
+        lat_flat = lat.ravel()
+        in_bbox = (lon_flat >= self.bbox[0]) & (lon_flat <= self.bbox[1]) \
+                & (lat_flat >= self.bbox[2]) & (lat_flat <= self.bbox[3])
+        indx = np.flatnonzero(in_bbox)
+        indx = indx[np.argsort(lat_flat[indx], kind='stable')]
+        px = lon_flat[indx]
+        py = lat_flat[indx]
+        crossings = np.zeros(len(indx), dtype=bool)
+        on_edge = np.zeros(len(indx), dtype=bool)
+        start = np.searchsorted(py, self.ymin, side='left')
+        stop = np.searchsorted(py, self.ymax, side='right')
+        for i in np.flatnonzero(stop > start):
+            s = slice(start[i], stop[i])
+            # cross > 0: point is on the left side of the edge
+            cross = self.dx[i] * (py[s] - self.y1[i]) - self.dy[i] * (px[s] - self.x1[i])
+            on_edge[s] |= (cross == 0) & (px[s] >= self.xmin[i]) & (px[s] <= self.xmax[i])
+            if self.dy[i] > 0:
+                crossings[s] ^= (cross > 0) & (py[s] < self.ymax[i])
+            elif self.dy[i] < 0:
+                crossings[s] ^= (cross < 0) & (py[s] < self.ymax[i])
+        is_odd = np.zeros(lon.size, dtype=bool)
+        is_on_edge = np.zeros(lon.size, dtype=bool)
+        is_odd[indx] = crossings
+        is_on_edge[indx] = on_edge
+        return is_odd.reshape(lon.shape), is_on_edge.reshape(lon.shape)
+
+
+class SphericalPolygon:
+    # polygon with great-circle edges prepared for repeated point-in-polygon
+    # tests on the unit sphere (no special care needed at the antimeridian or
+    # the poles): vertex unit vectors, edge normals and a spherical cap
+    # (center, cosine of the angular radius) around the polygon
+    __slots__ = ('lon', 'lat', 'v1', 'v2', 'normal', 'v12', 'center', 'cos_radius')
+
+    def __init__(self, polygon_lon, polygon_lat):
+        self.lon = np.asarray(polygon_lon, dtype=float)
+        self.lat = np.asarray(polygon_lat, dtype=float)
+        xyz = lonlat_to_xyz(self.lon, self.lat)
+        self.v1, self.v2 = xyz[:-1], xyz[1:]
+        self.normal = np.cross(self.v1, self.v2)
+        self.v12 = np.sum(self.v1 * self.v2, axis=1)
+        self.center, self.cos_radius = spherical_cap(xyz)
+
+    def contains(self, lon, lat):
+        # boolean mask (same shape as lon) of points inside the polygon or on its edges
+        is_odd, on_edge = self.crossings(lon, lat)
+        return is_odd | on_edge
+
+    def crossings(self, lon, lat):
+        # masks (same shape as lon) of points enclosed by the polygon and of
+        # points on its edges; only the points within the cap are tested
+        lon = np.asarray(lon, dtype=float)
+        lat = np.asarray(lat, dtype=float)
+        xyz = lonlat_to_xyz(lon, lat)
+        indx = np.flatnonzero(xyz @ self.center >= self.cos_radius - 1e-12)
+        is_odd = np.zeros(lon.size, dtype=bool)
+        on_edge = np.zeros(lon.size, dtype=bool)
+        is_odd[indx], on_edge[indx] = self.crossings_xyz(xyz[indx])
+        return is_odd.reshape(lon.shape), on_edge.reshape(lon.shape)
+
+    def crossings_xyz(self, xyz, block=2**22):
+        # winding-number test of points given as unit vectors (n x 3): the
+        # signed angles subtended by the edges at a point add up to +-360
+        # degrees if the polygon winds around it and to zero otherwise (valid
+        # if the polygon does not also enclose the antipode of the point).
+        # Points in blocks of 'block' (point, edge) pairs
+        is_odd = np.zeros(len(xyz), dtype=bool)
+        on_edge = np.zeros(len(xyz), dtype=bool)
+        if len(self.v1) == 0:
+            return is_odd, on_edge
+        tolerance = 1e-12 * np.linalg.norm(self.normal, axis=1)
+        npoints = max(1, block // len(self.v1))
+        for ib in range(0, len(xyz), npoints):
+            points = slice(ib, ib + npoints)
+            pv1 = xyz[points] @ self.v1.T
+            pv2 = xyz[points] @ self.v2.T
+            # sine (pn) and cosine (dot) parts of the angles between the
+            # tangent directions towards the two vertices of every edge
+            pn = xyz[points] @ self.normal.T
+            dot = self.v12 - pv1 * pv2
+            is_odd[points] = np.abs(np.arctan2(pn, dot).sum(axis=1)) > np.pi
+            # on the great circle of an edge and between (or at) its vertices
+            on_edge[points] = ((np.abs(pn) <= tolerance) & (dot <= tolerance) & (pv1 + pv2 > 0)).any(axis=1)
+        return is_odd, on_edge
+
+
+class PolygonCollection:
+    # point-in-polygon tests against many polygon features at once.
+    # features: list of features, each a list of closed rings [lon, lat]
+    # (exterior rings, holes and parts of multipart features). A point is in
+    # a feature if it is on one of its rings or crosses its rings an odd
+    # number of times (even-odd rule: holes are excluded). Candidate features
+    # of the points are found with an R-tree over the feature bounding boxes.
+    # Features with at most 'small_size' edges are tested for all their
+    # candidate points at once; larger features one by one.
+    # spherical=True: edges are great-circle arcs and points are tested on
+    # the sphere (SphericalPolygon); candidate points of every feature are
+    # then found with a KD-tree of the points' unit vectors
+    def __init__(self, features, node_size=16, small_size=64, spherical=False):
+        for rings in features:
+            for ring in rings:
+                if ring[0][0] != ring[0][-1] or ring[1][0] != ring[1][-1]:
+                    print(f"Error in class PolygonCollection! The first and last points must be the same (closed polygon).\n")
+                    exit(1)
+        self.spherical = spherical
+        if spherical:
+            self.features = [[SphericalPolygon(ring[0], ring[1]) for ring in rings] for rings in features]
+            self.caps = [spherical_cap(lonlat_to_xyz(np.concatenate([ring.lon for ring in rings]),
+                                                     np.concatenate([ring.lat for ring in rings])))
+                         if len(rings) else (np.array([0.0, 0.0, 1.0]), 2.0)
+                         for rings in self.features]
+            return
+        self.features = [[PreparedPolygon(ring[0], ring[1]) for ring in rings] for rings in features]
+        self.bbox = np.array([[min(ring.bbox[0] for ring in rings), max(ring.bbox[1] for ring in rings),
+                               min(ring.bbox[2] for ring in rings), max(ring.bbox[3] for ring in rings)]
+                              for rings in self.features], dtype=float).reshape(-1, 4)
+        self.tree = BoxTree(self.bbox, node_size)
+        self.small_size = small_size
+        # edges of all features: edges[edge_start[i]:edge_start[i+1]] of the i-th feature
+        rings = [ring for rings in self.features for ring in rings]
+        self.nedges = np.array([sum(len(ring.dx) for ring in rings) for rings in self.features], dtype=int)
+        self.edge_start = np.concatenate([[0], np.cumsum(self.nedges)])
+        self.edges = {}
+        for key in ['x1', 'y1', 'dx', 'dy', 'xmin', 'xmax', 'ymin', 'ymax']:
+            self.edges[key] = np.concatenate([getattr(ring, key) for ring in rings]) \
+                              if len(rings) else np.zeros(0)
+
+    def __len__(self):
+        return len(self.features)
+
+    def count(self, lon, lat):
+        # number of features that contain each point (same shape as lon)
+        lon = np.asarray(lon, dtype=float)
+        lat = np.asarray(lat, dtype=float)
+        lon_flat = lon.ravel()
+        lat_flat = lat.ravel()
+        if self.spherical:
+            return self._count_spherical(lon_flat, lat_flat).reshape(lon.shape)
+        count = np.zeros(lon.size, dtype=int)
+        ipoint, ifeature = self.tree.query_points(lon_flat, lat_flat)
+        has_edges = self.nedges[ifeature] > 0
+        ipoint, ifeature = ipoint[has_edges], ifeature[has_edges]
+        is_small = self.nedges[ifeature] <= self.small_size
+        is_in = self._pairs_contain(ipoint[is_small], ifeature[is_small], lon_flat, lat_flat)
+        count += np.bincount(ipoint[is_small][is_in], minlength=lon.size)
+        ipoint, ifeature = ipoint[~is_small], ifeature[~is_small]
+        order = np.argsort(ifeature, kind='stable')
+        ipoint = ipoint[order]
+        feature_start = np.searchsorted(ifeature[order], np.arange(len(self.features) + 1))
+        for i in np.flatnonzero(np.diff(feature_start)):
+            points = ipoint[feature_start[i]:feature_start[i+1]]
+            count[points] += self.feature_contains(i, lon_flat[points], lat_flat[points])
+        return count.reshape(lon.shape)
+
+    def _count_spherical(self, lon, lat):
+        # count() of spherical collections: the points within the cap of a
+        # feature are its candidates (even-odd rule over its rings)
+        from scipy.spatial import cKDTree
+        count = np.zeros(len(lon), dtype=int)
+        finite = np.flatnonzero(np.isfinite(lon) & np.isfinite(lat))
+        if len(finite) == 0:
+            return count
+        xyz = lonlat_to_xyz(lon[finite], lat[finite])
+        tree = cKDTree(xyz)
+        for rings, (center, cos_radius) in zip(self.features, self.caps):
+            if cos_radius > 1:
+                continue
+            # chord length of the cap radius
+            chord = np.sqrt(max(0.0, 2 * (1 - cos_radius))) + 1e-12
+            ipoint = np.array(tree.query_ball_point(center, chord), dtype=int)
+            if len(ipoint) == 0:
+                continue
+            is_odd = np.zeros(len(ipoint), dtype=bool)
+            on_edge = np.zeros(len(ipoint), dtype=bool)
+            for ring in rings:
+                ring_odd, ring_on_edge = ring.crossings_xyz(xyz[ipoint])
+                is_odd ^= ring_odd
+                on_edge |= ring_on_edge
+            count[finite[ipoint]] += is_odd | on_edge
+        return count
+
+    def _pairs_contain(self, ipoint, ifeature, lon, lat, block=2**22):
+        # for (point, feature) pairs: is the point in the feature? (even-odd
+        # rule over all edges of the feature; pairs in blocks of 'block' edges)
+        is_in = np.zeros(len(ipoint), dtype=bool)
+        if len(ipoint) == 0:
+            return is_in
+        nedges = self.nedges[ifeature]
+        npairs = max(1, block // max(1, int(nedges.max())))
+        for ib in range(0, len(ipoint), npairs):
+            pairs = slice(ib, ib + npairs)
+            nedge = nedges[pairs]
+            # one element per (pair, edge of the pair's feature)
+            first = np.cumsum(nedge) - nedge
+            iedge = np.repeat(self.edge_start[ifeature[pairs]], nedge) \
+                  + np.arange(int(nedge.sum())) - np.repeat(first, nedge)
+            px = np.repeat(lon[ipoint[pairs]], nedge)
+            py = np.repeat(lat[ipoint[pairs]], nedge)
+            e = {key: val[iedge] for key, val in self.edges.items()}
+            in_range = (py >= e['ymin']) & (py <= e['ymax'])
+            # cross > 0: point is on the left side of the edge
+            cross = e['dx'] * (py - e['y1']) - e['dy'] * (px - e['x1'])
+            crossing = in_range & (py < e['ymax']) & (cross * e['dy'] > 0)
+            on_edge = in_range & (cross == 0) & (px >= e['xmin']) & (px <= e['xmax'])
+            is_odd = np.add.reduceat(crossing.astype(int), first) % 2 == 1
+            is_in[pairs] = is_odd | np.logical_or.reduceat(on_edge, first)
+        return is_in
+
+    def feature_contains(self, ifeature, lon, lat):
+        # boolean mask of points in the 'ifeature'-th feature
+        is_odd = np.zeros(np.shape(lon), dtype=bool)
+        on_edge = np.zeros(np.shape(lon), dtype=bool)
+        for ring in self.features[ifeature]:
+            ring_odd, ring_on_edge = ring.crossings(lon, lat)
+            is_odd ^= ring_odd
+            on_edge |= ring_on_edge
+        return is_odd | on_edge
+
+    def contains(self, lon, lat, how='union'):
+        # boolean mask of points in any ('union') or all ('intersection') of the features
+        count = self.count(lon, lat)
+        if how == 'union':
+            return count > 0
+        elif how == 'intersection':
+            return count == len(self.features)
+        else:
+            print(f"Error in class PolygonCollection! Unknown operation: '{how}'")
+            exit(1)
+
+
+class BoxTree:
+    # static R-tree over boxes [min_lon, max_lon, min_lat, max_lat]; nodes of
+    # 'node_size' entries are packed with the sort-tile-recursive method
+    def __init__(self, boxes, node_size=16):
+        boxes = np.asarray(boxes, dtype=float).reshape(-1, 4)
+        self.node_size = node_size
+        self.boxes = boxes
+        # leaf entries: boxes in packing order
+        self.order = self._pack_order(boxes)
+        entry_boxes = boxes[self.order]
+        # levels[i] = (node boxes, first entry, last entry + 1); levels[-1]: root
+        self.levels = []
+        while True:
+            start = np.arange(0, len(entry_boxes), node_size)
+            stop = np.minimum(start + node_size, len(entry_boxes))
+            node_boxes = np.column_stack([np.minimum.reduceat(entry_boxes[:, 0], start),
+                                          np.maximum.reduceat(entry_boxes[:, 1], start),
+                                          np.minimum.reduceat(entry_boxes[:, 2], start),
+                                          np.maximum.reduceat(entry_boxes[:, 3], start)]) \
+                         if len(entry_boxes) else np.zeros((0, 4))
+            if len(node_boxes) > 1:
+                node_order = self._pack_order(node_boxes)
+                node_boxes, start, stop = node_boxes[node_order], start[node_order], stop[node_order]
+            self.levels.append((node_boxes, start, stop))
+            if len(node_boxes) <= 1:
+                break
+            entry_boxes = node_boxes
+
+    def _pack_order(self, boxes):
+        # sort-tile-recursive order: vertical slices by box center longitude,
+        # boxes sorted by center latitude within each slice
+        nslices = max(1, int(np.ceil(np.sqrt(len(boxes) / self.node_size))))
+        slice_size = nslices * self.node_size
+        order = np.argsort(boxes[:, 0] + boxes[:, 1], kind='stable')
+        for i in range(0, len(order), slice_size):
+            indx = order[i:i+slice_size]
+            order[i:i+slice_size] = indx[np.argsort(boxes[indx, 2] + boxes[indx, 3], kind='stable')]
+        return order
+
+    def query_boxes(self, boxes):
+        # all pairs (query box index, box index) of overlapping boxes
+        boxes = np.asarray(boxes, dtype=float).reshape(-1, 4)
+        iquery = np.arange(len(boxes))
+        inode = np.zeros(len(boxes), dtype=int) # root node
+        for node_boxes, start, stop in self.levels[::-1]:
+            if len(node_boxes) == 0:
+                return np.zeros(0, dtype=int), np.zeros(0, dtype=int)
+            is_in = self._overlap(node_boxes[inode], boxes[iquery])
+            iquery, inode = iquery[is_in], inode[is_in]
+            # descend: every (query, node) pair to (query, child) pairs
+            nchild = stop[inode] - start[inode]
+            first = np.repeat(np.cumsum(nchild) - nchild, nchild)
+            iquery = np.repeat(iquery, nchild)
+            inode = np.repeat(start[inode], nchild) + np.arange(len(first)) - first
+        ibox = self.order[inode]
+        is_in = self._overlap(self.boxes[ibox], boxes[iquery])
+        return iquery[is_in], ibox[is_in]
+
+    def query_points(self, lon, lat, block=2**22):
+        # all pairs (point index, box index) with the point in the box. Points
+        # are binned into grid cells (about one per box) and the tree is queried
+        # with the bounding box of the points of each cell; the candidate boxes
+        # of a cell are then checked for its points (in blocks of 'block' pairs)
+        lon = np.asarray(lon, dtype=float).ravel()
+        lat = np.asarray(lat, dtype=float).ravel()
+        ipoint = np.flatnonzero(np.isfinite(lon) & np.isfinite(lat))
+        if len(ipoint) == 0 or len(self.boxes) == 0:
+            return np.zeros(0, dtype=int), np.zeros(0, dtype=int)
+        ngrid = int(np.ceil(np.sqrt(min(len(ipoint), len(self.boxes)))))
+        cell = np.zeros(len(ipoint), dtype=int)
+        for coord in [lon[ipoint], lat[ipoint]]:
+            cmin, cmax = coord.min(), coord.max()
+            icell = np.zeros(len(coord), dtype=int) if cmax == cmin \
+                    else np.minimum((coord - cmin) / (cmax - cmin) * ngrid, ngrid - 1).astype(int)
+            cell = cell * ngrid + icell
+        order = np.argsort(cell, kind='stable')
+        ipoint = ipoint[order]
+        cell_start = np.flatnonzero(np.diff(cell[order], prepend=-1))
+        cell_npoints = np.diff(np.append(cell_start, len(ipoint)))
+        cell_boxes = np.column_stack([np.minimum.reduceat(lon[ipoint], cell_start),
+                                      np.maximum.reduceat(lon[ipoint], cell_start),
+                                      np.minimum.reduceat(lat[ipoint], cell_start),
+                                      np.maximum.reduceat(lat[ipoint], cell_start)])
+        icell, ibox = self.query_boxes(cell_boxes)
+        # (cell, box) pairs -> (point, box) pairs
+        npairs = cell_npoints[icell]
+        ipoint_all = []
+        ibox_all = []
+        ib = 0
+        while ib < len(icell):
+            ie = ib + max(1, np.searchsorted(np.cumsum(npairs[ib:]), block, side='right'))
+            nrep = npairs[ib:ie]
+            first = np.repeat(np.cumsum(nrep) - nrep, nrep)
+            points = ipoint[np.repeat(cell_start[icell[ib:ie]], nrep) + np.arange(len(first)) - first]
+            boxes = np.repeat(ibox[ib:ie], nrep)
+            is_in = self._in_boxes(boxes, lon[points], lat[points])
+            ipoint_all.append(points[is_in])
+            ibox_all.append(boxes[is_in])
+            ib = ie
+        if len(ipoint_all) == 0:
+            return np.zeros(0, dtype=int), np.zeros(0, dtype=int)
+        return np.concatenate(ipoint_all), np.concatenate(ibox_all)
+
+    def _in_boxes(self, ibox, lon, lat):
+        return (lon >= self.boxes[ibox, 0]) & (lon <= self.boxes[ibox, 1]) \
+             & (lat >= self.boxes[ibox, 2]) & (lat <= self.boxes[ibox, 3])
+
+    def _overlap(self, boxes1, boxes2):
+        return (boxes1[:, 0] <= boxes2[:, 1]) & (boxes1[:, 1] >= boxes2[:, 0]) \
+             & (boxes1[:, 2] <= boxes2[:, 3]) & (boxes1[:, 3] >= boxes2[:, 2])
+
+
+def _is_scalar_line(line):
+    # are the point coordinates of the line plain numbers (not arrays)?
+    return isinstance(line.point1.lon, (int, float)) and isinstance(line.point1.lat, (int, float)) \
+       and isinstance(line.point2.lon, (int, float)) and isinstance(line.point2.lat, (int, float))
+
+
+def points_in_polygon(lon, lat, polygon_lon, polygon_lat):
+    # boolean mask (same shape as lon) of points inside the polygon or on its
+    # edges; use PreparedPolygon to test more points against the same polygon
+    return PreparedPolygon(polygon_lon, polygon_lat).contains(lon, lat)
+
+
+def lonlat_to_xyz(lon, lat):
+    # unit vectors (n x 3 array) of points on the sphere
+    lon = np.radians(np.asarray(lon, dtype=float).ravel())
+    lat = np.radians(np.asarray(lat, dtype=float).ravel())
+    return np.column_stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)])
+
+
+def spherical_cap(xyz):
+    # cap (center unit vector, cosine of the angular radius) around the points
+    # xyz (n x 3 unit vectors). A cap smaller than a hemisphere also contains
+    # the great-circle arcs between the points; otherwise the whole sphere
+    # (cosine = -1) is returned
+    center = np.sum(xyz, axis=0)
+    norm = np.linalg.norm(center)
+    if len(xyz) == 0 or norm == 0:
+        return np.array([0.0, 0.0, 1.0]), -1.0
+    center = center / norm
+    cos_radius = float(np.min(xyz @ center))
+    if cos_radius <= 0:
+        return center, -1.0
+    return center, cos_radius
+
+
+def calc_gcarc(lon1, lat1, lon2, lat2):
+    # great-circle arc (degrees) between points 1 and 2 (arrays are broadcasted)
+    lon1, lat1 = np.radians(lon1), np.radians(lat1)
+    lon2, lat2 = np.radians(lon2), np.radians(lat2)
+    delta_lon = lon2 - lon1
+    delta_lat = lat2 - lat1
+    a = (np.sin(delta_lat / 2))**2 + np.cos(lat1) * np.cos(lat2) * (np.sin(delta_lon / 2))**2
+    gcarc = 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+    return np.degrees(gcarc)
+
+
+def calc_dist(lon1, lat1, lon2, lat2):
+    # great-circle distance (km) between points 1 and 2 using the earth
+    # radius at the mid latitude (arrays are broadcasted)
+    mid_lat = np.radians((np.asarray(lat1) + np.asarray(lat2)) / 2)
+    return calc_earth_radius(mid_lat) * np.radians(calc_gcarc(lon1, lat1, lon2, lat2))
+
+
+def calc_az(lon1, lat1, lon2, lat2):
+    # azimuth (degrees, 0-360) from point 1 to point 2 (arrays are broadcasted)
+    lon1, lat1 = np.radians(lon1), np.radians(lat1)
+    lon2, lat2 = np.radians(lon2), np.radians(lat2)
+    delta_lon = lon2 - lon1
+    az = np.arctan2(np.sin(delta_lon) * np.cos(lat2),
+                    np.cos(lat1) * np.sin(lat2) - np.sin(lat1) * np.cos(lat2) * np.cos(delta_lon))
+    az = np.degrees(az)
+    return np.where(az < 0, az + 360, az)
+
+
+def calc_baz(lon1, lat1, lon2, lat2):
+    # back-azimuth (degrees, 0-360): azimuth from point 2 to point 1
+    return calc_az(lon2, lat2, lon1, lat1)
 
 
 def calc_earth_radius(lat):
-    from math import cos, sin, sqrt
+    # earth radius at latitude 'lat' (radians; arrays are accepted)
+    # formula from https://rechneronline.de/earth-radius/
     r1 = 6378 # radius at equator
     r2 = 6356 # radius at pole
-    a1 = r1**2 * cos(lat)
-    a2 = r2**2 * sin(lat)
-    b1 = r1 * cos(lat)
-    b2 = r2 * sin(lat)
-    earth_radius = sqrt((a1**2 + a2**2) / (b1**2 + b2**2))
+    a1 = r1**2 * np.cos(lat)
+    a2 = r2**2 * np.sin(lat)
+    b1 = r1 * np.cos(lat)
+    b2 = r2 * np.sin(lat)
+    earth_radius = np.sqrt((a1**2 + a2**2) / (b1**2 + b2**2))
     return earth_radius
 
 
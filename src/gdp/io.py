@@ -1,11 +1,45 @@
 #!/usr/bin/env python3
 
 import os
+import sys
+
+def open_file(datfile, mode='r'):
+    # open a text file for reading ('r'), writing ('w') or appending ('a');
+    # '.gz', '.xz' and '.zst' files are (de)compressed on the fly
+    ext = os.path.splitext(datfile)[1].lower()
+    if ext == '.gz':
+        import gzip
+        return gzip.open(datfile, f"{mode}t")
+    elif ext == '.xz':
+        import lzma
+        return lzma.open(datfile, f"{mode}t")
+    elif ext == '.zst':
+        try:
+            import zstandard
+        except ImportError:
+            print(f"Error! Python package 'zstandard' is required for '.zst' files: '{datfile}'")
+            exit(1)
+        from io import TextIOWrapper
+        if mode == 'r':
+            # appended outputs are concatenated zstd frames
+            dctx = zstandard.ZstdDecompressor()
+            stream = dctx.stream_reader(open(datfile, 'rb'), read_across_frames=True, closefd=True)
+        else:
+            # multithreaded compression (threads=-1: all logical cores)
+            cctx = zstandard.ZstdCompressor(threads=-1)
+            stream = cctx.stream_writer(open(datfile, f"{mode}b"), closefd=True)
+        return TextIOWrapper(stream)
+    return open(datfile, mode)
+
+
+def is_compressed(datfile):
+    return os.path.splitext(datfile)[1].lower() in ['.gz', '.xz', '.zst']
+
 
 def read_1D_datalist(input_datalist, fmt):
     datalist = {}
     try:
-        fopen = open(input_datalist, 'r')
+        fopen = open_file(input_datalist, 'r')
         flines = fopen.read().splitlines()
         fopen.close()
     except Exception as e:
@@ -41,7 +75,7 @@ def read_1D_datalist(input_datalist, fmt):
 def read_2D_datalist(input_datalist, fmt):
     datalist = {}
     try:
-        fopen = open(input_datalist, 'r')
+        fopen = open_file(input_datalist, 'r')
         flines = fopen.read().splitlines()
         fopen.close()
     except Exception as e:
@@ -73,169 +107,634 @@ def read_2D_datalist(input_datalist, fmt):
 
 
 
-def read_numerical_data(datfile, header, footer,  fmt, pos_indx, val_indx, skipnan=False):
-    from numpy import array
-    from numpy import nan as npnan
-    if len(fmt) == 1:
-        fmt = [fmt[0], fmt[0]]
-    else:
-        fmt = fmt
-    if len(pos_indx):
-        pos_indx = array(pos_indx) - 1 # index of positional columns
-        pos_indx = pos_indx.tolist()
-    else:
-        pos_indx = []
-    if len(val_indx):
-        val_indx = array(val_indx) - 1
-        val_indx = val_indx.tolist()
-    else:
-        val_indx = []
-    pos = [[] for ix in range(len(pos_indx))] # list of positional values
-    val = [[] for iv in range(len(val_indx))] # list of values/data
-    extra = []
-    # read lines
+def read_numerical_data(datfile, header, footer,  fmt, pos_indx, val_indx, skipnan=False, cache=False, noextra=False):
+    pos, val, extra = read_numerical_columns(datfile, header, footer, pos_indx, val_indx, skipnan, cache, noextra)
+    dat = [pos.tolist(), val.tolist(), extra]
+    return dat
+
+
+def read_numerical_columns(datfile, header, footer, pos_indx, val_indx, skipnan=False, cache=False, noextra=False):
+    # same as read_numerical_data, but positional and value columns are
+    # returned as float64 arrays with shape (ncol, nol)
+    # noextra=True: extra columns are not needed by the caller (returned as '')
+    pos_indx = [int(ix) - 1 for ix in pos_indx] # index of positional columns
+    val_indx = [int(iv) - 1 for iv in val_indx]
+    if cache:
+        cached = _load_cached_columns(datfile, header, footer, pos_indx, val_indx, skipnan, noextra)
+        if cached is not None:
+            return cached
+    if is_columnar(datfile):
+        # header/footer lines do not apply to columnar files
+        dat = read_columnar_columns(datfile, pos_indx, val_indx, skipnan, noextra)
+        if cache:
+            _save_cached_columns(datfile, header, footer, pos_indx, val_indx, skipnan, noextra, dat)
+        return dat
+    # fast path: files with a constant number of numerical columns
     try:
-        fopen = open(datfile, 'r')
-        if footer != 0:
-            datalines = fopen.read().splitlines()[header:-footer]
-        else:
-            datalines = fopen.read().splitlines()[header:]
-        fopen.close()
+        table = read_regular_columns(datfile, header, footer)
     except Exception as exc:
         print(exc)
         exit(0)
-    nol = len(datalines)
-    # process lines: positional columns
-    for i in range(nol):
-        ncol = len(datalines[i].split())
-        for ix in range(len(pos_indx)):
-            # positional arguments
-            try:
-                if datalines[i].split()[pos_indx[ix]] == 'nan':
-                    pos[ix].append(npnan)
-                else:
-                    pos[ix].append(float(datalines[i].split()[pos_indx[ix]]))
-            except:
-                pos[ix].append(npnan)
-    # process lines: val & extra
-    for i in range(nol):
-        ncol = len(datalines[i].split())
-        for iv in range(len(val_indx)):
-            # value arguments
-            try:
-                if datalines[i].split()[val_indx[iv]] == 'nan':
-                    val[iv].append(npnan)
-                else:
-                    val[iv].append(float(datalines[i].split()[val_indx[iv]]))
-            except:
-                val[iv].append(npnan)
-        # extra
-        extra_str_lst = datalines[i].split()
-        for ix in range(len(pos_indx)):
-            if pos_indx[ix] >= len(datalines[i].split()):
-                pos_str = npnan
-            else:
-                pos_str = datalines[i].split()[pos_indx[ix]]
-            if pos_str in extra_str_lst:
-                extra_str_lst.remove(pos_str)
-        for iv in range(len(val_indx)):
-            if val_indx[iv] >= len(datalines[i].split()):
-                val_str = npnan
-            else:
-                val_str = datalines[i].split()[val_indx[iv]]
-            if val_str in extra_str_lst:
-                extra_str_lst.remove(val_str)
-        extra_str = ' '.join(extra_str_lst).strip()
-        extra.append(extra_str)
-    dat = [pos, val, extra]
-    # skipnan = True ?
-    if skipnan:
-        pos_skipnan = [[] for ix in range(len(pos_indx))]
-        val_skipnan = [[] for iv in range(len(val_indx))]
-        extra_skipnan = []
-        for i in range(nol):
-            temp = []
-            for ix in range(len(pos_indx)):
-                temp.append(pos[ix][i])
-            for iv in range(len(val_indx)):
-                temp.append(val[iv][i])
-            if npnan not in temp:
-                for ix in range(len(pos_indx)):
-                    pos_skipnan[ix].append(pos[ix][i])
-                for iv in range(len(val_indx)):
-                    val_skipnan[iv].append(val[iv][i])
-                extra_skipnan.append(extra[i])
-        dat = [pos_skipnan, val_skipnan, extra_skipnan]
+    if table is not None and not noextra:
+        # extra columns are only known as text; use the fast path only
+        # if all columns are selected (i.e. there are no extra columns)
+        ncol = table.shape[1]
+        selected = set([col % ncol for col in pos_indx + val_indx if -ncol <= col < ncol])
+        if len(selected) != ncol:
+            table = None
+    if table is not None:
+        dat = _select_numerical_columns(table, pos_indx, val_indx, skipnan)
+    else:
+        # read lines in chunks (header and footer lines are never stored)
+        try:
+            dat = _parse_numerical_file(datfile, header, footer, pos_indx, val_indx, skipnan)
+        except Exception as exc:
+            print(exc)
+            exit(0)
+    if cache:
+        _save_cached_columns(datfile, header, footer, pos_indx, val_indx, skipnan, noextra, dat)
     return dat
 
 
+def read_regular_columns(datfile, header=0, footer=0, blocksize=2**24):
+    # memory-mapped reader for whitespace-delimited numerical files with a
+    # constant number of columns on every line; returns a float64 array
+    # with shape (nol, ncol), or None if the file does not qualify (ragged
+    # or empty lines, non-numerical items) and must be read line by line
+    import mmap
+    import warnings
+    import numpy as np
+    if is_compressed(datfile):
+        return None
+    with open(datfile, 'rb') as fopen:
+        if os.fstat(fopen.fileno()).st_size == 0:
+            return None
+        with mmap.mmap(fopen.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            start, end = _data_byte_range(mm, header, footer)
+            if start >= end:
+                return None
+            # number of columns from the first data line
+            first_nl = mm.find(b'\n', start, end)
+            ncol = len(mm[start:(end if first_nl < 0 else first_nl)].split())
+            if ncol == 0:
+                return None
+            # newline-aligned blocks and their number of lines
+            blocks = []
+            a = start
+            while a < end:
+                b = min(a + blocksize, end)
+                if b < end:
+                    nl = mm.find(b'\n', b - 1, end)
+                    b = end if nl < 0 else nl + 1
+                blocks.append([a, b])
+                a = b
+            nol = [mm[a:b].count(b'\n') for a, b in blocks]
+            if mm[end-1:end] != b'\n':
+                nol[-1] += 1
+            table = np.empty((sum(nol), ncol), dtype=np.float64)
+            i = 0
+            for (a, b), n in zip(blocks, nol):
+                block = mm[a:b]
+                if not _is_regular_block(block, ncol, n):
+                    return None
+                try:
+                    with warnings.catch_warnings():
+                        # older numpy versions only warn about unparsed data
+                        warnings.simplefilter('error', DeprecationWarning)
+                        values = np.fromstring(block, dtype=np.float64, sep=' ')
+                except (ValueError, DeprecationWarning):
+                    return None
+                if values.size != n * ncol:
+                    return None
+                table[i:i+n] = values.reshape(n, ncol)
+                i += n
+    return table
+
+
+def _data_byte_range(mm, header, footer):
+    # byte offsets of the data lines between 'header' and 'footer' lines
+    start = 0
+    for i in range(header):
+        nl = mm.find(b'\n', start)
+        if nl < 0:
+            return [len(mm), len(mm)]
+        start = nl + 1
+    end = len(mm)
+    if footer != 0:
+        if mm[end-1:end] == b'\n':
+            end -= 1
+        for i in range(footer):
+            nl = mm.rfind(b'\n', start, end)
+            if nl < 0:
+                return [start, start]
+            end = nl
+        end += 1 # keep the newline of the last data line
+    return [start, end]
+
+
+def _is_regular_block(block, ncol, nol):
+    # True if every line of 'block' has exactly 'ncol' whitespace-delimited items
+    import numpy as np
+    buf = np.frombuffer(block, dtype=np.uint8)
+    is_space = (buf == 32) | ((buf >= 9) & (buf <= 13))
+    item_start = ~is_space
+    item_start[1:] &= is_space[:-1]
+    newlines = np.flatnonzero(buf == 10)
+    line_of_item = np.searchsorted(newlines, np.flatnonzero(item_start))
+    items_per_line = np.bincount(line_of_item, minlength=nol)
+    return len(items_per_line) == nol and bool(np.all(items_per_line == ncol))
+
+
+def _select_numerical_columns(table, pos_indx, val_indx, skipnan=False, extra=None):
+    # same output as _parse_numerical_lines for a (nol, ncol) table
+    import numpy as np
+    nol, ncol = table.shape
+    pos = np.empty((len(pos_indx), nol), dtype=np.float64)
+    val = np.empty((len(val_indx), nol), dtype=np.float64)
+    for ix, col in enumerate(pos_indx):
+        pos[ix] = table[:, col] if -ncol <= col < ncol else np.nan
+    for iv, col in enumerate(val_indx):
+        val[iv] = table[:, col] if -ncol <= col < ncol else np.nan
+    if extra == None:
+        extra = [''] * nol
+    # skipnan = True ?
+    if skipnan and nol:
+        keep = ~(np.isnan(pos).any(axis=0) | np.isnan(val).any(axis=0))
+        if not keep.all():
+            pos = pos[:, keep]
+            val = val[:, keep]
+            extra = [extra[i] for i in np.flatnonzero(keep)]
+    return [pos, val, extra]
+
+
+#-------------------------#
+# parse cache: parsed columns are stored as .npy files in a hidden sidecar
+# directory next to the data file ('.<filename>.gdpcache'); cache entries
+# are keyed on file size & mtime, header/footer and column selection
+
+def _cache_paths(datfile, header, footer, pos_indx, val_indx, skipnan, noextra):
+    import hashlib
+    datfile = os.path.abspath(datfile)
+    fstat = os.stat(datfile)
+    cache_dir = os.path.join(os.path.dirname(datfile), f".{os.path.basename(datfile)}.gdpcache")
+    stamp = f"{fstat.st_size}-{fstat.st_mtime_ns}"
+    selection = f"{header} {footer} {pos_indx} {val_indx} {bool(skipnan)} {bool(noextra)}"
+    key = f"{stamp}-{hashlib.sha1(selection.encode()).hexdigest()[:16]}"
+    return [cache_dir, stamp, os.path.join(cache_dir, key)]
+
+
+def _load_cached_columns(datfile, header, footer, pos_indx, val_indx, skipnan, noextra):
+    import numpy as np
+    try:
+        _, _, key_path = _cache_paths(datfile, header, footer, pos_indx, val_indx, skipnan, noextra)
+        pos = np.load(f"{key_path}.pos.npy", mmap_mode='r')
+        val = np.load(f"{key_path}.val.npy", mmap_mode='r')
+        if os.path.isfile(f"{key_path}.extra"):
+            with open(f"{key_path}.extra", 'r') as fopen:
+                extra = fopen.read().split('\n')
+        else: # no extra columns
+            extra = [''] * max(pos.shape[1], val.shape[1])
+    except (OSError, ValueError):
+        return None
+    return [pos, val, extra]
+
+
+def _save_cached_columns(datfile, header, footer, pos_indx, val_indx, skipnan, noextra, dat):
+    import numpy as np
+    pos, val, extra = dat
+    try:
+        cache_dir, stamp, key_path = _cache_paths(datfile, header, footer, pos_indx, val_indx, skipnan, noextra)
+        os.makedirs(cache_dir, exist_ok=True)
+        # remove cache entries of older versions of this data file
+        for f in os.listdir(cache_dir):
+            if not f.startswith(f"{stamp}-"):
+                os.remove(os.path.join(cache_dir, f))
+        # write to temporary files first, so that a cache entry is never partial
+        if any(len(x) for x in extra):
+            with open(f"{key_path}.extra.tmp", 'w') as fopen:
+                fopen.write('\n'.join(extra))
+            os.replace(f"{key_path}.extra.tmp", f"{key_path}.extra")
+        for name, arr in [('val', val), ('pos', pos)]:
+            with open(f"{key_path}.{name}.tmp", 'wb') as fopen:
+                np.save(fopen, arr)
+            os.replace(f"{key_path}.{name}.tmp", f"{key_path}.{name}.npy")
+    except OSError as exc:
+        print(f"WARNING! Could not write parse cache for '{datfile}': {exc}", file=sys.stderr)
+
+
+def _parse_numerical_lines(datalines, pos_indx, val_indx, skipnan=False):
+    # pos_indx and val_indx are zero-based column indices here
+    import numpy as np
+    # tokenize every line once
+    tokens = [line.split() for line in datalines]
+    pos = np.empty((len(pos_indx), len(tokens)), dtype=np.float64)
+    val = np.empty((len(val_indx), len(tokens)), dtype=np.float64)
+    for ix, col in enumerate(pos_indx):
+        pos[ix] = _parse_float_column(tokens, col)
+    for iv, col in enumerate(val_indx):
+        val[iv] = _parse_float_column(tokens, col)
+    extra = _extra_columns(tokens, pos_indx + val_indx)
+    # skipnan = True ?
+    if skipnan and len(tokens):
+        keep = ~(np.isnan(pos).any(axis=0) | np.isnan(val).any(axis=0))
+        if not keep.all():
+            pos = pos[:, keep]
+            val = val[:, keep]
+            extra = [extra[i] for i in np.flatnonzero(keep)]
+    return [pos, val, extra]
+
+
+def _parse_numerical_file(datfile, header, footer, pos_indx, val_indx, skipnan=False, chunksize=100000):
+    # _parse_numerical_lines applied to chunks of lines of a file
+    import numpy as np
+    pos, val, extra = [[], [], []]
+    datalines = iter_file_lines(datfile, header, footer)
+    for chunk in iter_chunks(datalines, chunksize):
+        chunk_pos, chunk_val, chunk_extra = _parse_numerical_lines(chunk, pos_indx, val_indx, skipnan)
+        pos.append(chunk_pos)
+        val.append(chunk_val)
+        extra.extend(chunk_extra)
+    if len(pos) == 0:
+        return _parse_numerical_lines([], pos_indx, val_indx, skipnan)
+    return [np.hstack(pos), np.hstack(val), extra]
+
+
+def _parse_float_column(tokens, col):
+    import numpy as np
+    column = [t[col] if -len(t) <= col < len(t) else 'nan' for t in tokens]
+    try:
+        return np.array(column, dtype=np.float64)
+    except ValueError:
+        # at least one non-numerical item; these become nan
+        parsed = np.empty(len(column), dtype=np.float64)
+        for i, item in enumerate(column):
+            try:
+                parsed[i] = float(item)
+            except ValueError:
+                parsed[i] = np.nan
+        return parsed
+
+
+def _extra_columns(tokens, indx):
+    # extra: all columns of a line except the (first occurrence of the)
+    # positional and value items
+    covered = 0
+    while covered in indx:
+        covered += 1
+    extra = []
+    for t in tokens:
+        if len(t) <= covered:
+            extra.append('')
+            continue
+        extra_str_lst = list(t)
+        for col in indx:
+            if col < len(t) and t[col] in extra_str_lst:
+                extra_str_lst.remove(t[col])
+        extra.append(' '.join(extra_str_lst))
+    return extra
+
+
 def data_lines(datfile,args):
+    return list(iter_data_lines(datfile, args))
+
+
+def iter_data_lines(datfile, args, chunksize=100000):
+    # generator version of data_lines: the input file is read and
+    # reformatted in chunks of 'chunksize' lines
     if len(args.fmt) == 1:
         fmt = [args.fmt[0], args.fmt[0]]
     else:
         fmt = args.fmt
-    if args.nan or len(args.x) == len(args.v) == 0:
+    if is_columnar(datfile):
+        if args.nan or len(args.x) == len(args.v) == 0:
+            print(f"Error! Columnar input files can only be read as numerical data: '{datfile}'")
+            exit(1)
+        pos, val, extra = read_numerical_columns(datfile, 0, 0, args.x, args.v, args.skipnan)
+        yield from _format_numerical_lines(pos, val, extra, fmt, args.noextra)
+    elif args.nan or len(args.x) == len(args.v) == 0:
         try:
-            fopen = open(datfile,'r')
-            if args.footer != 0:
-                datalines_all = fopen.read().splitlines()[args.header:-args.footer]
-            else:
-                datalines_all = fopen.read().splitlines()[args.header:]
-            fopen.close()
+            for line in iter_file_lines(datfile, args.header, args.footer):
+                yield line.strip()
         except Exception as exc:
             print(f"Error reading input file: {datfile}\n")
             exit(1)
-        datalines = []
-        for x in datalines_all:
-            datalines.append(x.strip())
     else:
-        data = read_numerical_data(datfile, args.header, args.footer,  args.fmt, args.x, args.v, args.skipnan)
-        from numpy import nan as npnan
-        datalines = []
-        nol = len(data[2])
-        for i in range(nol):
-            pos_str = []
-            for ix in range(len(data[0])):
-                pos_str.append( f"%{fmt[0]}f" %(data[0][ix][i]) )
-            line_str = ' '.join(pos_str)
-            for iv in range(len(data[1])):
-                if data[1][iv][i] != npnan:
-                    line_str = f"%s %{fmt[1]}f" %(line_str, data[1][iv][i])
-                else:
-                    line_str = f"{line_str} {npnan}"
-            if len(data[2][i]) and not args.noextra:
-                line_str = "%s %s" %(line_str, data[2][i])
-            datalines.append(line_str)
-    return datalines
-
-
-def output_lines(lines, args):
-    len_line = []
-    lines_strip = []
-    for x in lines:
-        len_line.append(len(x))
-        lines_strip.append(x.strip())
-    lines_out = []
-    if args.uniq:
-        for x in lines_strip:
-            if x not in lines_out:
-                lines_out.append(x)
+        pos_indx = [ix - 1 for ix in args.x]
+        val_indx = [iv - 1 for iv in args.v]
+        try:
+            datalines = iter_file_lines(datfile, args.header, args.footer)
+            for chunk in iter_chunks(datalines, chunksize):
+                pos, val, extra = _parse_numerical_lines(chunk, pos_indx, val_indx, args.skipnan)
+                yield from _format_numerical_lines(pos, val, extra, fmt, args.noextra)
+        except OSError as exc:
+            print(exc)
+            exit(0)
+
+
+def _format_numerical_lines(pos, val, extra, fmt, noextra=False):
+    row_fmt = ' '.join([f"%{fmt[0]}f"] * len(pos)) + f" %{fmt[1]}f" * len(val)
+    lines = format_column_lines(list(pos) + list(val), row_fmt)
+    for i, line_str in enumerate(lines):
+        if len(extra[i]) and not noextra:
+            line_str = "%s %s" %(line_str, extra[i])
+        yield line_str
+
+
+#-------------------------#
+# bulk formatting of numerical columns: 'row_fmt' is a printf-style format
+# of one output line (e.g. "%.4f %.4f %.2f") applied to blocks of rows
+
+def format_column_blocks(columns, row_fmt, chunksize=100000):
+    # yield blocks of newline-terminated lines
+    import numpy as np
+    columns = [np.asarray(col) for col in columns]
+    nrows = len(columns[0]) if len(columns) else 0
+    block_fmt = (row_fmt + '\n') * chunksize
+    for i in range(0, nrows, chunksize):
+        block = np.column_stack([col[i:i+chunksize] for col in columns])
+        if len(block) < chunksize:
+            block_fmt = (row_fmt + '\n') * len(block)
+        yield block_fmt %(tuple(block.ravel().tolist()))
+
+
+def format_column_lines(columns, row_fmt, chunksize=100000):
+    for block in format_column_blocks(columns, row_fmt, chunksize):
+        yield from block.splitlines()
+
+
+def write_column_lines(columns, row_fmt, args, header_lines=[], names=None):
+    # same as output_lines(header_lines + formatted columns, args), but
+    # formatted blocks are written directly if sort and uniq are disabled;
+    # columnar output files get the unformatted columns ('names' or the
+    # items of the first header line as column names)
+    from itertools import chain
+    if args.outfile and is_columnar(args.outfile):
+        if names == None and len(header_lines):
+            names = header_lines[0].split()
+        if names == None or len(names) != len(columns):
+            names = [f"col{i+1}" for i in range(len(columns))]
+        write_columnar(columns, names, args.outfile, args.append)
+        return
+    if args.sort or args.uniq:
+        output_lines(chain(header_lines, format_column_lines(columns, row_fmt)), args)
+        return
+    if args.outfile:
+        if args.append:
+            fopen = open_file(args.outfile, 'a')
+        else:
+            fopen = open_file(args.outfile, 'w')
     else:
-        lines_out = lines_strip
-    if args.sort:
-        lines_out, len_line = zip(*sorted(zip(lines_out, len_line)))
-        lines_out = list(lines_out)
-        len_line = list(len_line)
+        fopen = sys.stdout
+    for x in header_lines:
+        fopen.write(f"{x}\n")
+    for block in format_column_blocks(columns, row_fmt):
+        fopen.write(block)
+    if args.outfile:
+        fopen.close()
+
+
+#-------------------------#
+# columnar files (Apache Arrow): '.parquet' and Arrow IPC ('.arrow', '.feather'),
+# selected by file extension; numerical columns are stored as float64
+
+def is_columnar(datfile):
+    return os.path.splitext(datfile)[1].lower() in ['.parquet', '.arrow', '.feather']
 
-    # undo strip
-    for i,x in enumerate(lines_out):
-        lines_out[i] = f"%{len_line[i]}s" %(x)
+
+def _import_pyarrow(datfile):
+    try:
+        import pyarrow
+        import pyarrow.parquet
+        import pyarrow.feather
+    except ImportError:
+        print(f"Error! Python package 'pyarrow' is required for columnar files: '{datfile}'")
+        exit(1)
+    return pyarrow
+
+
+def read_columnar_columns(datfile, pos_indx, val_indx, skipnan=False, noextra=False):
+    # read_numerical_columns for columnar files (zero-based column indices);
+    # only the selected columns are read unless extra columns are required
+    import numpy as np
+    pa = _import_pyarrow(datfile)
+    is_parquet = os.path.splitext(datfile)[1].lower() == '.parquet'
+    try:
+        if is_parquet:
+            names = pa.parquet.read_schema(datfile).names
+        else:
+            # arrow IPC files are memory-mapped; unused columns are never read
+            table = pa.feather.read_table(datfile, memory_map=True)
+            names = table.column_names
+        ncol = len(names)
+        selected = sorted(set([col % ncol for col in pos_indx + val_indx if -ncol <= col < ncol]))
+        if is_parquet and noextra:
+            table = pa.parquet.read_table(datfile, columns=[names[col] for col in selected])
+        elif is_parquet:
+            table = pa.parquet.read_table(datfile)
+    except Exception as exc:
+        print(exc)
+        exit(0)
+    nol = table.num_rows
+    # float64 table of the selected columns; out of range columns -> nan
+    values = np.empty((nol, len(selected)), dtype=np.float64)
+    for i, col in enumerate(selected):
+        values[:, i] = _columnar_to_float(table.column(names[col]))
+    # column indices in 'values' (len(selected): out of range)
+    pos_indx = [selected.index(col % ncol) if -ncol <= col < ncol else len(selected) for col in pos_indx]
+    val_indx = [selected.index(col % ncol) if -ncol <= col < ncol else len(selected) for col in val_indx]
+    extra = None
+    if not noextra:
+        extra_names = [names[col] for col in range(ncol) if col not in selected]
+        extra_columns = [table.column(name).to_pylist() for name in extra_names]
+        extra = [' '.join([str(x) for x in row]) for row in zip(*extra_columns)] if len(extra_names) else None
+    return _select_numerical_columns(values, pos_indx, val_indx, skipnan, extra)
+
+
+def _columnar_to_float(column):
+    # arrow column -> float64 array; nulls and non-numerical items are nan
+    import numpy as np
+    try:
+        return np.asarray(column.to_numpy(zero_copy_only=False), dtype=np.float64)
+    except (TypeError, ValueError):
+        parsed = np.empty(len(column), dtype=np.float64)
+        for i, item in enumerate(column.to_pylist()):
+            try:
+                parsed[i] = float(item)
+            except (TypeError, ValueError):
+                parsed[i] = np.nan
+        return parsed
+
+
+def write_columnar(columns, names, outfile, append=False):
+    import numpy as np
+    pa = _import_pyarrow(outfile)
+    if append:
+        print(f"Error! Cannot append to columnar output file: '{outfile}'")
+        exit(1)
+    arrays = []
+    for col in columns:
+        col = np.asarray(col)
+        if col.dtype.kind in 'biuf':
+            arrays.append(col.astype(np.float64))
+        else: # text column
+            arrays.append(pa.array(col.astype(str).tolist()))
+    table = pa.table(arrays, names=names)
+    if os.path.splitext(outfile)[1].lower() == '.parquet':
+        pa.parquet.write_table(table, outfile)
+    else:
+        pa.feather.write_feather(table, outfile)
+
+
+def _write_columnar_lines(lines, outfile, append=False, names=None):
+    # columnar output of text lines (whitespace-delimited columns)
+    import numpy as np
+    rows = [line.split() for line in lines]
+    ncol = len(rows[0]) if len(rows) else len(names or [])
+    if any(len(row) != ncol for row in rows):
+        print(f"Error! Output lines do not have a constant number of columns: '{outfile}'")
+        exit(1)
+    columns = []
+    for col in range(ncol):
+        column = [row[col] for row in rows]
+        try:
+            columns.append(np.array(column, dtype=np.float64))
+        except ValueError: # text column
+            columns.append(column)
+    if names == None or len(names) != ncol:
+        names = [f"col{col+1}" for col in range(ncol)]
+    write_columnar(columns, names, outfile, append)
+
+
+def round_to_fmt(arr, fmt):
+    # values as they would be read back after '%{fmt}f' formatting; the
+    # string round trip is only needed where rint may pick the other side
+    import numpy as np
+    arr = np.asarray(arr, dtype=np.float64)
+    digits = int(fmt.rpartition(".")[2] or 0) if "." in fmt else 6
+    if digits > 15:
+        rounded = [float(f"%{fmt}f" %(x)) for x in arr.ravel().tolist()]
+        return np.array(rounded, dtype=np.float64).reshape(arr.shape)
+    scale = 10.0 ** digits
+    with np.errstate(invalid="ignore", over="ignore"):
+        scaled = arr * scale
+        rounded = np.rint(scaled) / scale
+        frac = np.abs(scaled - np.trunc(scaled))
+        exact = (np.abs(frac - 0.5) <= 1e-9 * (1.0 + np.abs(scaled))) | (np.abs(scaled) >= 2.0**52)
+    idx = np.flatnonzero(exact)
+    if idx.size:
+        np.put(rounded, idx, [float(f"%{fmt}f" %(x)) for x in arr.ravel()[idx].tolist()])
+    return rounded
+
+
+def iter_file_lines(datfile, header=0, footer=0):
+    # yield lines of a text file without the header and footer lines;
+    # only 'footer' lines are held in memory at a time
+    from itertools import islice
+    from collections import deque
+    with open_file(datfile, 'r') as fopen:
+        flines = (line.rstrip('\n') for line in islice(fopen, header, None))
+        if footer == 0:
+            yield from flines
+        else:
+            buffer = deque()
+            for line in flines:
+                buffer.append(line)
+                if len(buffer) > footer:
+                    yield buffer.popleft()
+
+
+def imap_files(func, files, jobs=1, *func_args):
+    # yield func(file, *func_args) for every file in input order; with
+    # jobs > 1, files are processed by a pool of 'jobs' processes
+    # (func must be a module-level function)
+    if jobs <= 1 or len(files) < 2:
+        for datfile in files:
+            yield func(datfile, *func_args)
+        return
+    from itertools import repeat
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=min(jobs, len(files))) as pool:
+        yield from pool.map(func, files, *[repeat(x) for x in func_args])
+
+
+def imap_shared(func, tasks, arrays, jobs=1, *func_args):
+    # yield func(task, arrays, *func_args) for every task in input order;
+    # with jobs > 1, tasks are processed by a pool of 'jobs' processes and
+    # 'arrays' (dict of numpy arrays, read-only) are shared with the workers
+    # through shared memory instead of being pickled for every task
+    # (func must be a module-level function)
+    if jobs <= 1 or len(tasks) < 2:
+        for task in tasks:
+            yield func(task, arrays, *func_args)
+        return
+    import numpy as np
+    from itertools import repeat
+    from multiprocessing import shared_memory
+    from concurrent.futures import ProcessPoolExecutor
+    blocks = []
+    specs = {}
+    try:
+        for key, array in arrays.items():
+            array = np.ascontiguousarray(array)
+            shm = shared_memory.SharedMemory(create=True, size=max(1, array.nbytes))
+            blocks.append(shm)
+            np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)[...] = array
+            specs[key] = (shm.name, array.shape, array.dtype.str)
+        with ProcessPoolExecutor(max_workers=min(jobs, len(tasks)),
+                                 initializer=_attach_shared, initargs=(specs,)) as pool:
+            yield from pool.map(_call_shared, repeat(func), tasks, *[repeat(x) for x in func_args])
+    finally:
+        for shm in blocks:
+            shm.close()
+            shm.unlink()
+
+
+# imap_shared worker state: shared memory blocks and their numpy views
+_shared_blocks = []
+_shared_arrays = {}
+
+
+def _attach_shared(specs):
+    import numpy as np
+    from multiprocessing import shared_memory
+    for key, (name, shape, dtype) in specs.items():
+        shm = shared_memory.SharedMemory(name=name)
+        _shared_blocks.append(shm)
+        _shared_arrays[key] = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+
+def _call_shared(func, task, *func_args):
+    return func(task, _shared_arrays, *func_args)
+
+
+def iter_chunks(iterable, chunksize):
+    from itertools import islice
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, chunksize))
+        if not chunk:
+            return
+        yield chunk
+
+
+def output_lines(lines, args, names=None):
+    # names: column names for columnar output files (optional)
+    if args.sort:
+        memory = getattr(args, 'memory', 512) # MB
+        lines_out = sorted_lines(lines, args.uniq, memory)
+    elif args.uniq:
+        lines_out = uniq_lines(lines)
+    else:
+        # stream lines (could be a generator) straight to the output
+        lines_out = (f"%{len(x)}s" %(x.strip()) for x in lines)
     # print to stdout or write to outfile
-    if args.outfile:
+    if args.outfile and is_columnar(args.outfile):
+        _write_columnar_lines(lines_out, args.outfile, args.append, names)
+    elif args.outfile:
         if args.append:
-            fopen = open(args.outfile,'a')
+            fopen = open_file(args.outfile, 'a')
         else:
-            fopen = open(args.outfile,'w')
+            fopen = open_file(args.outfile, 'w')
         for x in lines_out:
             fopen.write(f"{x}\n")
         fopen.close()
@@ -244,6 +743,64 @@ def output_lines(lines, args):
             print(f"{x}")
 
 
+def uniq_lines(lines):
+    # first-seen order is kept; leading/trailing spaces are ignored in
+    # comparisons but kept (as right-justification) in the output lines
+    seen = set()
+    for x in lines:
+        x_strip = x.strip()
+        if x_strip not in seen:
+            seen.add(x_strip)
+            yield f"%{len(x)}s" %(x_strip)
+
+
+def sorted_lines(lines, uniq=False, memory=512):
+    # external merge sort: sorted runs of at most 'memory' MB are spilled
+    # to temporary files and then k-way merged
+    import heapq
+    budget = memory * 1024 ** 2
+    runs = []
+    chunk = []
+    chunk_size = 0
+    try:
+        for i, x in enumerate(lines):
+            x_strip = x.strip()
+            # records sort by line, then by input order (uniq) or length
+            chunk.append((x_strip, i if uniq else len(x), len(x)))
+            chunk_size += len(x_strip) + 100 # rough per-record overhead
+            if chunk_size >= budget:
+                runs.append(_spill_sorted_run(chunk))
+                chunk = []
+                chunk_size = 0
+        chunk.sort()
+        merged = heapq.merge(iter(chunk), *[_read_sorted_run(run) for run in runs])
+        previous = None
+        for x_strip, _, len_line in merged:
+            if uniq and x_strip == previous:
+                continue
+            previous = x_strip
+            yield f"%{len_line}s" %(x_strip)
+    finally:
+        for run in runs:
+            run.close()
+
+
+def _spill_sorted_run(chunk):
+    import tempfile
+    chunk.sort()
+    run = tempfile.TemporaryFile(mode='w+', newline='\n')
+    for x_strip, order, len_line in chunk:
+        run.write(f"{order}\t{len_line}\t{x_strip}\n")
+    run.seek(0)
+    return run
+
+
+def _read_sorted_run(run):
+    for record in run:
+        order, len_line, x_strip = record[:-1].split('\t', 2)
+        yield (x_strip, int(order), int(len_line))
+
+
 def return_polygon_objects(polygon_files):
     try:
         from . import _geographic as geographic
@@ -334,6 +891,59 @@ def read_polygon_shp(polygon_file):
 
 
 
+def read_polygon_shp_features(polygon_file):
+    # same as read_polygon_shp, but each feature is a list of all its rings
+    # ([x, y]): exterior rings, holes and parts of multipart features
+    import numpy as np
+    import geopandas as gpd
+    from shapely.geometry import mapping
+    try:
+        shp_features = mapping(gpd.read_file(polygon_file))['features']
+    except Exception as e:
+        print(f"Error! Could not read shape file: '{polygon_file}'\n{e}\n")
+        exit(1)
+    features = []
+    for i, feature in enumerate(shp_features):
+        try:
+            geometry = feature['geometry']
+            if geometry['type'] == 'Polygon':
+                parts = [geometry['coordinates']]
+            elif geometry['type'] == 'MultiPolygon':
+                parts = geometry['coordinates']
+            else:
+                raise ValueError(f"Geometry type is not polygon: '{geometry['type']}'")
+            rings = []
+            for part in parts:
+                for ring in part:
+                    ring = np.array(ring, dtype=float)
+                    rings.append([ring[:, 0].tolist(), ring[:, 1].tolist()])
+        except Exception as e:
+            print(f"Error! Could not read shape file item '{i+1}': '{polygon_file}'\n{e}\n")
+            exit(1)
+        features.append(rings)
+    return features
+
+
+def read_polygon_collection(polygon_files):
+    # PolygonCollection of the polygons in the given files: features of
+    # shape files (with holes and parts), and polygons of ascii files
+    try:
+        from . import _geographic as geographic
+    except:
+        from . import geographic
+    features = []
+    for pf in polygon_files:
+        if not os.path.isfile(pf):
+            print(f"Error! Could not file polygon file: '{pf}'")
+            exit(0)
+        ext = os.path.splitext(pf)[1]
+        if ext == '.shp':
+            features += read_polygon_shp_features(pf)
+        else:
+            features += [[ply_xy] for ply_xy in read_polygon_ascii(pf)]
+    return geographic.PolygonCollection(features)
+
+
 def read_point_shp(point_file):
     import numpy as np
     import geopandas as gpd
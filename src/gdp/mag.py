@@ -285,17 +285,10 @@ def calc_polygon_mask(polygon_x, polygon_y, nodes_meshgrid_x, nodes_meshgrid_y):
             print("WARNING! Could not use cythonized module: geographic")
             from . import geographic
 
-    ny, nx = nodes_meshgrid_x.shape
     nodes_meshgrid_mask = np.multiply(np.nan, nodes_meshgrid_x)
-    for ix in range(nx):
-        for iy in range(ny):
-            xn = nodes_meshgrid_x[iy][ix]
-            yn = nodes_meshgrid_y[iy][ix]
-            point = geographic.Point(xn, yn)
-            polygon = geographic.Polygon(polygon_x, polygon_y)
-            is_pip = polygon.is_point_in(point)
-            if is_pip:
-                nodes_meshgrid_mask[iy][ix] = 1.0
+    polygon = geographic.Polygon(polygon_x, polygon_y)
+    is_pip = polygon.is_points_in(nodes_meshgrid_x, nodes_meshgrid_y)
+    nodes_meshgrid_mask[is_pip] = 1.0
     return nodes_meshgrid_mask
 
 #-------------------------#
@@ -338,7 +331,8 @@ def directional_derivatives(args):
     # read input data
     [[mag_x, mag_y],[mag_v], _] = io.read_numerical_data(args.input_file, args.header,
                                                          args.footer, args.fmt,
-                                                         args.x, args.v, skipnan=True)
+                                                         args.x, args.v, skipnan=True,
+                                                         cache=args.cache, noextra=True)
     mag_points = np.vstack((mag_x, mag_y)).T
     
     # max gap
@@ -375,25 +369,19 @@ def directional_derivatives(args):
         print("Interpolation (2D Gridding) ... (adaptive smoothing)")
     else:
         print("Interpolation (2D Gridding) ... (1st pass: adaptive smoothing)")
-    nodes_all_mag_p1 = [] # pass 1
-    for i, xn in enumerate(nodes_all_x):
-        yn = nodes_all_y[i]
-        # node value (adaptive smoothing)
-        vn = funcs.get_grid_value(xn, yn, mag_x, mag_y, mag_v, nodes_all_smth[i]) 
-        nodes_all_mag_p1.append(vn)
+    # pass 1: node values (adaptive smoothing)
+    nodes_all_mag_p1 = funcs.get_grid_values(nodes_all_x, nodes_all_y, mag_x, mag_y, mag_v,
+                                             nodes_all_smth, args.jobs)
 
     if args.fixedsmoothing > 0:
-        nodes_all_mag_p2 = [] # pass 2
         print("Interpolation (2D Gridding) ... (2nd pass: fixed smoothing)") # for denoising purpose
         if args.fixedsmoothing == 9999:
             smoothing = args.interval
         else:
             smoothing = args.fixedsmoothing
-        for i, xn in enumerate(nodes_all_x):
-            yn = nodes_all_y[i]
-            # node value (fixed smoothing):
-            vn = funcs.get_grid_value(xn, yn, nodes_all_x, nodes_all_y, nodes_all_mag_p1, smoothing)
-            nodes_all_mag_p2.append(vn)
+        # pass 2: node values (fixed smoothing)
+        nodes_all_mag_p2 = funcs.get_grid_values(nodes_all_x, nodes_all_y, nodes_all_x, nodes_all_y,
+                                                 nodes_all_mag_p1, smoothing, args.jobs)
         nodes_all_mag = nodes_all_mag_p2
     else:
         nodes_all_mag = nodes_all_mag_p1
@@ -571,27 +559,16 @@ def directional_derivatives(args):
         args.fmt[0] = f"{xcollen}.{xcollen - 9}"
         args.fmt[1] = f"{vcollen}.{vcollen - 7}"
 
-    output_lines = [f"%{xcollen}s%{xcollen}s" %("X", "Y")]
+    header_line = f"%{xcollen}s%{xcollen}s" %("X", "Y")
     for dataset_name in output_datasets.keys():
-        output_lines[0] += f"%{vcollen}s" %(dataset_name)
-    for i in np.arange(nodes_all_ny):
-        for j in np.arange(nodes_all_nx):
-            if mask_final[i][j] != 1:
-                continue
-            x = nodes_all_x_meshgrid[i][j]
-            y = nodes_all_y_meshgrid[i][j]
-            output_lines.append(f"%{args.fmt[0]}f%{args.fmt[0]}f" %(x, y))
-    # append data to the intialized output_lines
+        header_line += f"%{vcollen}s" %(dataset_name)
+    # output nodes inside the final mask (row by row)
+    mask_nodes = mask_final == 1
+    output_columns = [nodes_all_x_meshgrid[mask_nodes], nodes_all_y_meshgrid[mask_nodes]]
     for dataset_name in output_datasets.keys():
-        dataset = output_datasets[dataset_name]
-        k = 1
-        for i in np.arange(nodes_all_ny):
-            for j in np.arange(nodes_all_nx):
-                if mask_final[i][j] != 1:
-                    continue
-                output_lines[k] += f"%{args.fmt[1]}f" %(dataset[i][j])
-                k += 1
-    io.output_lines(output_lines, args)
+        output_columns.append(output_datasets[dataset_name][mask_nodes])
+    row_fmt = f"%{args.fmt[0]}f%{args.fmt[0]}f" + f"%{args.fmt[1]}f" * len(output_datasets)
+    io.write_column_lines(output_columns, row_fmt, args, header_lines=[header_line])
 
     if args.noplots:
         print("Finished!")
@@ -29,6 +29,60 @@ def clear_screen():
         os.system('cls')
 
 
+def _add_jobs_argument(parser, purpose):
+    parser.add_argument(
+        '--jobs',
+        type=int,
+        action='store',
+        default=1,
+        help=f'number of parallel processes for {purpose} (default=1)')
+
+
+def _add_memory_argument(parser):
+    parser.add_argument(
+        '--memory',
+        type=float,
+        action='store',
+        default=512,
+        help='memory budget (MB) for sort; larger outputs are sorted using temporary files (default=512)')
+
+
+def _add_cache_argument(parser):
+    parser.add_argument(
+        '--cache',
+        action='store_true',
+        help='cache parsed input data (.npy files next to input) to speed up later runs')
+
+
+def _add_tolerance_argument(parser):
+    parser.add_argument(
+        '--tolerance',
+        type=float,
+        action='store',
+        default=0,
+        help='match positions within this distance (nearest point; default=0: exact match of formatted positions)')
+
+
+def _add_presorted_argument(parser):
+    parser.add_argument(
+        '--presorted',
+        action='store_true',
+        help='input files are already sorted by position as text, not numerically (e.g. outputs of --sort, or of \'LC_ALL=C sort\'); merge them as streams instead of holding all input lines in memory')
+
+
+def _add_tile_arguments(parser):
+    parser.add_argument(
+        '--tile',
+        type=int,
+        action='store',
+        help='out-of-core gridding: generate, grid and write the grid nodes in tiles of about this many nodes '+
+             '(requires --outfile; ascii output lines are in node order) or to a NetCDF file (*.nc)')
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        help='resume an interrupted out-of-core gridding (--tile) from its last completed tile')
+
+
 def parse_args(*args, **kwargs):
 
     parser = argparse.ArgumentParser('gdp',
@@ -107,6 +161,8 @@ def parse_args(*args, **kwargs):
         '--uniq',
         action='store_true',
         help='apply uniq to output lines')
+    _add_memory_argument(data_cat)
+    _add_jobs_argument(data_cat, 'reading input files')
     data_cat.add_argument(
         '--noextra',
         action='store_true',
@@ -177,6 +233,13 @@ def parse_args(*args, **kwargs):
         '--uniq',
         action='store_true',
         help='apply uniq to output lines')
+    _add_memory_argument(data_union)
+    data_union.add_argument(
+        '--stream',
+        action='store_true',
+        help='with --nan: stream the input files; only the distinct lines are held in memory')
+    _add_presorted_argument(data_union)
+    _add_jobs_argument(data_union, 'reading input files')
     data_union.add_argument(
         '--noextra',
         action='store_true',
@@ -252,6 +315,14 @@ def parse_args(*args, **kwargs):
         '--uniq',
         action='store_true',
         help='apply uniq to output lines')
+    _add_memory_argument(data_intersect)
+    _add_tolerance_argument(data_intersect)
+    data_intersect.add_argument(
+        '--stream',
+        action='store_true',
+        help='with --nan: stream the input files; only the lines of the smallest file are held in memory')
+    _add_presorted_argument(data_intersect)
+    _add_jobs_argument(data_intersect, 'reading input files')
     data_intersect.add_argument(
         '--noextra',
         action='store_true',
@@ -327,6 +398,14 @@ def parse_args(*args, **kwargs):
         '--uniq',
         action='store_true',
         help='apply uniq to output lines')
+    _add_memory_argument(data_difference)
+    _add_tolerance_argument(data_difference)
+    data_difference.add_argument(
+        '--stream',
+        action='store_true',
+        help='with --nan: stream the input files; only the lines of the first file are held in memory')
+    _add_presorted_argument(data_difference)
+    _add_jobs_argument(data_difference, 'reading input files')
     data_difference.add_argument(
         '--noextra',
         action='store_true',
@@ -414,6 +493,13 @@ def parse_args(*args, **kwargs):
         action='store',
         default=0,
         help='number of footer lines to ignore (default=0)')
+    _add_tolerance_argument(data_add)
+    data_add.add_argument(
+        '--average',
+        action='store_true',
+        help='output the average of the matched values instead of their sum')
+    _add_presorted_argument(data_add)
+    _add_jobs_argument(data_add, 'reading input files')
 
     #------------------------#
     # $> gdp data split
@@ -709,11 +795,17 @@ def parse_args(*args, **kwargs):
         action='store',
         default=0,
         help='number of footer lines to ignore (default=0)')
+    _add_cache_argument(data_pip)
+    _add_jobs_argument(data_pip, 'processing input files')
     data_pip.add_argument(
         '-i',
         '--inverse',
         action='store_true',
-        help='inverse operation: points outside polygon (only if one polygon is given)')
+        help='inverse operation: points outside polygon(s)')
+    data_pip.add_argument(
+        '--spherical',
+        action='store_true',
+        help='point-in-polygon on the sphere: polygon edges are great-circle arcs (use for global data, near the poles or across the antimeridian)')
     data_pip.add_argument(
         '--xrange',
         nargs=2,
@@ -790,6 +882,10 @@ def parse_args(*args, **kwargs):
         action='store',
         help='polygon to run "points-in-polygon" process before outputing the results'
     )
+    data_nodes.add_argument(
+        '--spherical',
+        action='store_true',
+        help='point-in-polygon on the sphere: polygon edges are great-circle arcs (use for global data, near the poles or across the antimeridian)')
     data_nodes.add_argument(
         '--fmt',
         nargs=3,
@@ -874,6 +970,8 @@ def parse_args(*args, **kwargs):
         action='store',
         default=0,
         help='number of footer lines to ignore (default=0)')
+    _add_cache_argument(data_gridder)
+    _add_jobs_argument(data_gridder, 'processing input files and gridding')
     data_gridder.add_argument(
         '--fmt',
         nargs='+',
@@ -898,6 +996,11 @@ def parse_args(*args, **kwargs):
         action='store',
         help='polygon to run "points-in-polygon" process before outputing the results'
     )
+    _add_tile_arguments(data_gridder)
+    data_gridder.add_argument(
+        '--spherical',
+        action='store_true',
+        help='point-in-polygon on the sphere: polygon edges are great-circle arcs (use for global data, near the poles or across the antimeridian)')
 
     #------------------------#
     # $> gdp data plot
@@ -1016,6 +1119,8 @@ def parse_args(*args, **kwargs):
         action='store',
         default=0,
         help='number of footer lines to ignore (default=0)')
+    _add_cache_argument(stats_min)
+    _add_jobs_argument(stats_min, 'processing input files')
     stats_min.add_argument(
         '--decimal',
         nargs=1,
@@ -1059,6 +1164,8 @@ def parse_args(*args, **kwargs):
         action='store',
         default=0,
         help='number of footer lines to ignore (default=0)')
+    _add_cache_argument(stats_max)
+    _add_jobs_argument(stats_max, 'processing input files')
     stats_max.add_argument(
         '--decimal',
         nargs=1,
@@ -1102,6 +1209,8 @@ def parse_args(*args, **kwargs):
         action='store',
         default=0,
         help='number of footer lines to ignore (default=0)')
+    _add_cache_argument(stats_sum)
+    _add_jobs_argument(stats_sum, 'processing input files')
     stats_sum.add_argument(
         '--decimal',
         nargs=1,
@@ -1145,6 +1254,8 @@ def parse_args(*args, **kwargs):
         action='store',
         default=0,
         help='number of footer lines to ignore (default=0)')
+    _add_cache_argument(stats_mean)
+    _add_jobs_argument(stats_mean, 'processing input files')
     stats_mean.add_argument(
         '--decimal',
         nargs=1,
@@ -1188,6 +1299,8 @@ def parse_args(*args, **kwargs):
         action='store',
         default=0,
         help='number of footer lines to ignore (default=0)')
+    _add_cache_argument(stats_median)
+    _add_jobs_argument(stats_median, 'processing input files')
     stats_median.add_argument(
         '--decimal',
         nargs=1,
@@ -1231,6 +1344,8 @@ def parse_args(*args, **kwargs):
         action='store',
         default=0,
         help='number of footer lines to ignore (default=0)')
+    _add_cache_argument(stats_std)
+    _add_jobs_argument(stats_std, 'processing input files')
     stats_std.add_argument(
         '--decimal',
         nargs=1,
@@ -1455,6 +1570,10 @@ def parse_args(*args, **kwargs):
         type=str,
         action='store',
         help='polygon to apply points-in-polygon')
+    raster_dat2nc.add_argument(
+        '--spherical',
+        action='store_true',
+        help='point-in-polygon on the sphere: polygon edges are great-circle arcs (use for global data, near the poles or across the antimeridian)')
     raster_dat2nc.add_argument(
         '--interval',
         type=float,
@@ -2444,6 +2563,8 @@ def parse_args(*args, **kwargs):
         action='store',
         default=0,
         help='number of footer lines to ignore (default=0)')
+    _add_cache_argument(mag_ddr)
+    _add_jobs_argument(mag_ddr, 'gridding')
     mag_ddr.add_argument(
         '--fmt',
         nargs='+',
@@ -3113,9 +3234,16 @@ def main(*args, **kwargs):
     if args.module == 'data':
 
         if args.submodule == 'cat':
-            out_lines = []
-            for inpfile in args.input_files:
-                out_lines += io.data_lines(inpfile, args)
+            from itertools import chain
+            # lines are streamed from input to output (bounded memory),
+            # unless --sort or --uniq require all lines at once
+            if args.jobs > 1:
+                # files are read in parallel; output order is the input order
+                out_lines = chain.from_iterable(
+                    io.imap_files(io.data_lines, args.input_files, args.jobs, args))
+            else:
+                out_lines = chain.from_iterable(
+                    io.iter_data_lines(inpfile, args) for inpfile in args.input_files)
             io.output_lines(out_lines, args)
             exit(0)
         elif args.submodule == 'union':
@@ -6,158 +6,160 @@ from . import io
 
 def union(args):
     nof = len(args.input_files)
-    input_files = args.input_files
-    datlines = [[] for i in range(nof)]
-    union = []
     if nof < 2:
         print("Error! Number of input_files should be larger than 2 for this operation.")
         exit(1)
-    for i in range(nof):
-        datlines[i] = io.data_lines(input_files[i],args)
-        nol = len(datlines[i])
-        for j in range(nol):
-            if datlines[i][j] not in union:
-                union.append(datlines[i][j])
-    if args.inverse:
-        union_inv = []
-        for i in range(nof):
-            nol = len(args.input_files)
-            for j in range(nol):
-                if datlines[i][j] not in union:
-                    union_inv.append(datlines[i][j])
-        io.output_lines(union_inv, args)
-    else:
-        io.output_lines(union, args)
-
+    read_lines = input_lines_reader(args)
+    io.output_lines(set_operation(read_lines, nof, 'union', args.inverse), args)
 
 
 def intersect(args):
     nof = len(args.input_files)
-    input_files = args.input_files
-    datlines = [[] for i in range(nof)]
-    intersect = []
     if nof < 2:
         print("Error! Number of input_files should be larger than 2 for this operation.")
         exit(1)
-    ###
-    for i in range(nof):
-        datlines[i] = io.data_lines(input_files[i],args)
-    nol = len(datlines[0])
-    for j in range(nol):
-        if all(datlines[0][j] in l for l in datlines[1:]):
-            intersect.append(datlines[0][j])
-    ###
-    if args.inverse:
-        intersect_inv = []
-        for i in range(nof):
-            nol = len(datlines[i])
-            for j in range(nol):
-                if datlines[i][j] not in intersect:
-                    intersect_inv.append(datlines[i][j])
-        io.output_lines(intersect_inv, args)
-    else:
-        io.output_lines(intersect, args)
-
-
-
+    read_lines = input_lines_reader(args)
+    smallest = smallest_input_file(args)
+    io.output_lines(set_operation(read_lines, nof, 'intersect', args.inverse, smallest), args)
 
 
 def difference(args):
     nof = len(args.input_files)
-    input_files = args.input_files
-    datlines = [[] for i in range(nof)]
-    difference = []
     if nof < 2:
         print("Error! Number of input_files should be larger than 2 for this operation.")
         exit(1)
-    ###
-    for i in range(nof):
-        datlines[i] = io.data_lines(input_files[i],args)
-    nol = len(datlines[0])
-    for j in range(nol):
-        if all(datlines[0][j] not in l for l in datlines[1:]):
-            difference.append(datlines[0][j])
-    ###
-    if args.inverse:
-        difference_inv = []
+    read_lines = input_lines_reader(args)
+    io.output_lines(set_operation(read_lines, nof, 'difference', args.inverse), args)
+
+
+def input_lines_reader(args):
+    # read_lines(i): lines of the i-th input file; with --stream, files are
+    # streamed (again) whenever they are needed instead of held in memory
+    if args.stream:
+        def read_lines(i):
+            return io.iter_data_lines(args.input_files[i], args)
+    else:
+        datlines = list(io.imap_files(io.data_lines, args.input_files, args.jobs, args))
+        def read_lines(i):
+            return datlines[i]
+    return read_lines
+
+
+def smallest_input_file(args):
+    # index of the input file that is held as a set by intersect in --stream mode
+    if not args.stream:
+        return 0
+    sizes = [os.path.getsize(f) if os.path.isfile(f) else 0 for f in args.input_files]
+    return sizes.index(min(sizes))
+
+
+def set_operation(read_lines, nof, operation, inverse=False, smallest=0):
+    # order-preserving, hash-based union/intersect/difference of the lines of
+    # 'nof' input files (yields output lines); union: the first occurrence of
+    # every line; intersect/difference: lines of the first file that are
+    # in all/none of the other files. inverse=True: lines that are not in the result.
+    # All files are streamed against a single set: the distinct lines (union),
+    # the lines of 'smallest' that are also in every other file (intersect) or
+    # the lines of the first file that are in none of the other files
+    # (difference); the first file is then read again for the ordered output
+    if operation == 'union':
+        result = _iter_union(read_lines, nof)
+    elif operation == 'intersect':
+        common_lines = set(read_lines(smallest))
         for i in range(nof):
-            nol = len(datlines[i])
-            for j in range(nol):
-                if datlines[i][j] not in difference:
-                    difference_inv.append(datlines[i][j])
-        io.output_lines(difference_inv, args)
+            if i != smallest:
+                common_lines.intersection_update(read_lines(i))
+        result = (line for line in read_lines(0) if line in common_lines)
     else:
-        io.output_lines(difference, args)
+        first_lines = set(read_lines(0))
+        for i in range(1, nof):
+            first_lines.difference_update(read_lines(i))
+        result = (line for line in read_lines(0) if line in first_lines)
+    if not inverse:
+        yield from result
+        return
+    result_lines = set(result)
+    for i in range(nof):
+        for line in read_lines(i):
+            if line not in result_lines:
+                yield line
+
+
+def _iter_union(read_lines, nof):
+    union_lines = set()
+    for i in range(nof):
+        for line in read_lines(i):
+            if line not in union_lines:
+                union_lines.add(line)
+                yield line
 
 
 def split_data_nrow(args):
+    # input lines are streamed; only one split dataset is held in memory
+    datalines = io.iter_file_lines(args.input_file[0], args.header, args.footer)
     try:
-        fopen = open(args.input_file[0],'r')
-        if args.footer != 0:
-            datalines = fopen.read().splitlines()[args.header:-args.footer]
-        else:
-            datalines = fopen.read().splitlines()[args.header:]
-    except Exception as exc:
+        for split_data_lines in io.iter_chunks(datalines, args.number):
+            output_split_data(split_data_lines, args)
+    except OSError as exc:
         print(exc)
         exit(1)
-    indexes = [x for x in range(0, len(datalines), args.number)]
-    if indexes[-1] < len(datalines):
-        indexes.append(len(datalines))
-    # split data
-    ndata = len(indexes) - 1
-    for i in range(ndata):
-        split_data_lines = datalines[indexes[i]:indexes[i+1]]
-        split_data_name = f"{'_'.join(split_data_lines[args.name-1].split())}.{args.ext}"
-        if args.outdir:
-            if not os.path.isdir(args.outdir):
-                os.mkdir(args.outdir)
-            fopen = open(f'{os.path.join(args.outdir, split_data_name)}','w')
-            fopen.write('\n'.join(split_data_lines))
-            fopen.write('\n')
-            fopen.close()
-        else:
-            stdout = [f"File name: {split_data_name}"] + split_data_lines
-            stdout = '\n'.join(stdout)
-            print(f"{stdout}\n")
 
 
 def split_data_ncol(args):
+    # input lines are streamed; only one split dataset is held in memory
+    datalines = io.iter_file_lines(args.input_file[0], args.header, args.footer)
     try:
-        fopen = open(args.input_file[0],'r')
-        if args.footer != 0:
-            datalines = fopen.read().splitlines()[args.header:-args.footer]
-        else:
-            datalines = fopen.read().splitlines()[args.header:]
-    except Exception as exc:
+        for split_data_lines in iter_ncol_splits(datalines, args.number, args.start):
+            output_split_data(split_data_lines, args)
+    except OSError as exc:
         print(exc)
         exit(1)
-    indexes = []
-    for i, dline in enumerate(datalines):
-        if len(dline.split()) == args.number:
-            indexes.append(i + args.start)
-    if indexes[-1] < len(datalines):
-        indexes.append(len(datalines))
-    # handle errors
-    if min(indexes) < 0:
-        print(f"\nError! Argument 'start' is too low!\n")
-        exit(1)
-    # split data
-    ndata = len(indexes) - 1
-    for i in range(ndata):
-        split_data_lines = datalines[indexes[i]:indexes[i+1]]
-        split_data_name = f"{'_'.join(split_data_lines[args.name-1].split())}.{args.ext}"
-        if args.outdir:
-            if not os.path.isdir(args.outdir):
-                os.mkdir(args.outdir)
-            fopen = open(f'{os.path.join(args.outdir, split_data_name)}','w')
-            fopen.write('\n'.join(split_data_lines))
-            fopen.write('\n')
-            fopen.close()
-        else:
-            stdout = [f"File name: {split_data_name}"] + split_data_lines
-            stdout = '\n'.join(stdout)
-            print(f"{stdout}\n")
-
-
 
 
+def iter_ncol_splits(datalines, ncol, start):
+    # yield datasets that start 'start' lines after (before if negative)
+    # every line with 'ncol' columns and end before the next dataset
+    from collections import deque
+    lookback = deque(maxlen=max(0, -start)) # lines before the first dataset
+    pending = deque() # upcoming dataset starts (start > 0)
+    split_data_lines = None
+    for i, dline in enumerate(datalines):
+        if len(pending) and pending[0] == i:
+            pending.popleft()
+            if split_data_lines != None:
+                yield split_data_lines
+            split_data_lines = []
+        if len(dline.split()) == ncol:
+            if i + start < 0:
+                print(f"\nError! Argument 'start' is too low!\n")
+                exit(1)
+            elif start > 0:
+                pending.append(i + start)
+            elif split_data_lines != None:
+                # the last -start lines belong to the next dataset
+                nol = len(split_data_lines) + start
+                yield split_data_lines[:nol]
+                split_data_lines = split_data_lines[nol:]
+            else:
+                split_data_lines = list(lookback)
+        if split_data_lines != None:
+            split_data_lines.append(dline)
+        else:
+            lookback.append(dline)
+    if split_data_lines != None:
+        yield split_data_lines
+
+
+def output_split_data(split_data_lines, args):
+    split_data_name = f"{'_'.join(split_data_lines[args.name-1].split())}.{args.ext}"
+    if args.outdir:
+        if not os.path.isdir(args.outdir):
+            os.mkdir(args.outdir)
+        fopen = open(f'{os.path.join(args.outdir, split_data_name)}','w')
+        fopen.write('\n'.join(split_data_lines))
+        fopen.write('\n')
+        fopen.close()
+    else:
+        stdout = [f"File name: {split_data_name}"] + split_data_lines
+        stdout = '\n'.join(stdout)
+        print(f"{stdout}\n")
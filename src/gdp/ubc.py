@@ -3,7 +3,6 @@
 import os
 from . import io
 from . import dat
-from . import geographic
 
 def mvi2xyz(args):
     import numpy as np
@@ -33,84 +32,50 @@ def mvi2xyz(args):
             if not os.path.isdir(outdir):
                 os.makedirs(outdir, exist_ok=True)
 
-        _, vals, _ = io.read_numerical_data(mod, 0, 0, ['.15','.15'], [], [1,2,3], skipnan=False)
+        _, vals, _ = io.read_numerical_data(mod, 0, 0, ['.15','.15'], [], [1,2,3], skipnan=False, noextra=True)
 
         ext_upper = os.path.splitext(mod)[1].split('.')[1].upper()
 
+        if len(vals[0]) < nmesh:
+            print(f"Model format error: '{mod}'.\nNumber of cells does not match with the input mesh.")
+            exit(1)
+
+        # cell centers in model order (z varies fastest, then x, then y)
+        mesh_y, mesh_x, mesh_z = np.meshgrid(Y, X, Z, indexing='ij')
+        pos_cols = [mesh_x.ravel(), mesh_y.ravel(), mesh_z.ravel()]
         if np.isnan(np.min(vals[1])):
-            outlines = [f" X Y Z MVI_{ext_upper}"]
-            index = -1
-            pos_cols = [[],[],[]]
-            val_cols = [[]]
-            for iy, y in enumerate(Y):
-                for ix, x in enumerate(X):
-                    for iz, z in enumerate(Z):
-                        index += 1
-                        value = [vals[0][index]]
-                        if args.skipdummy and value[0] == -100.0:
-                            continue
-                        else:
-                            pos_cols[0].append(x)
-                            pos_cols[1].append(y)
-                            pos_cols[2].append(z)
-                            val_cols[0].append(value[0])
-                            outlines.append(
-                                f"%{args.fmt[0]}f %{args.fmt[0]}f %{args.fmt[0]}f %{args.fmt[1]}f" 
-                                %(x, y, z, value[0]))
+            header_line = f" X Y Z MVI_{ext_upper}"
+            val_cols = [np.array(vals[0][:nmesh], dtype=float)]
+            keep = np.ones(nmesh, dtype=bool)
+            if args.skipdummy:
+                keep = val_cols[0] != -100.0
         else:
-            outlines = [f" X Y Z MVI_{ext_upper}1 MVI_{ext_upper}2 MVI_{ext_upper}3"]
-            index = -1
-            pos_cols = [[],[],[]]
-            val_cols = [[],[],[]]
-            for iy, y in enumerate(Y):
-                for ix, x in enumerate(X):
-                    for iz, z in enumerate(Z):
-                        index += 1
-                        value = [vals[0][index], vals[1][index], vals[2][index]]
-                        if args.skipdummy and (value == [-100.0, -100.0, -100.0] or value == [0.0, 0.0, 0.0]):
-                            continue
-                        else:
-                            pos_cols[0].append(x)
-                            pos_cols[1].append(y)
-                            pos_cols[2].append(z)
-                            val_cols[0].append(value[0])
-                            val_cols[1].append(value[1])
-                            val_cols[2].append(value[2])
-                            outlines.append(
-                                f"%{args.fmt[0]}f %{args.fmt[0]}f %{args.fmt[0]}f %{args.fmt[1]}f %{args.fmt[1]}f %{args.fmt[1]}f"
-                                %(x,y,z, value[0], value[1], value[2]))
+            header_line = f" X Y Z MVI_{ext_upper}1 MVI_{ext_upper}2 MVI_{ext_upper}3"
+            val_cols = [np.array(v[:nmesh], dtype=float) for v in vals]
+            keep = np.ones(nmesh, dtype=bool)
+            if args.skipdummy:
+                is_dummy = np.all([v == -100.0 for v in val_cols], axis=0)
+                is_zero = np.all([v == 0.0 for v in val_cols], axis=0)
+                keep = ~(is_dummy | is_zero)
 
         # apply point-in-polygon ?
         if len(args.polygon):
-            if len(value) == 3:
-                outlines = [f" X Y Z MVI_{ext_upper}1 MVI_{ext_upper}2 MVI_{ext_upper}3"]
-            else:
-                outlines = [f" X Y Z MVI_{ext_upper}"]
-            polygons = io.return_polygon_objects(args.polygon)
-            for ip in range(len(pos_cols[0])): # loop over points
-                pip = True
-                point = geographic.Point(pos_cols[0][ip], pos_cols[1][ip])
-                for polygon in  polygons:
-                    if not polygon.is_point_in(point):
-                        pip = False
-                if pip and len(value) == 1:
-                    outlines.append(f"%{args.fmt[0]}f %{args.fmt[0]}f %{args.fmt[0]}f %{args.fmt[1]}f"
-                        %(pos_cols[0][ip], pos_cols[1][ip], pos_cols[2][ip], val_cols[0][ip]))
-                elif pip and len(value) == 3:
-                    outlines.append(f"%{args.fmt[0]}f %{args.fmt[0]}f %{args.fmt[0]}f %{args.fmt[1]}f %{args.fmt[1]}f %{args.fmt[1]}f"
-                        %(pos_cols[0][ip], pos_cols[1][ip], pos_cols[2][ip], val_cols[0][ip], val_cols[1][ip], val_cols[2][ip]))
+            polygons = io.read_polygon_collection(args.polygon)
+            keep &= polygons.contains(pos_cols[0], pos_cols[1], 'intersection')
         
         args.outfile = os.path.join(outdir, f"{os.path.splitext(os.path.split(mod)[1])[0]}_{ext_upper.lower()}.xyz")
         args.uniq = False
         args.sort = False
         args.append = False
-        io.output_lines(outlines, args)
+        row_fmt = f"%{args.fmt[0]}f %{args.fmt[0]}f %{args.fmt[0]}f" + f" %{args.fmt[1]}f" * len(val_cols)
+        io.write_column_lines([col[keep] for col in pos_cols + val_cols], row_fmt, args, header_lines=[header_line])
         print('Output:', args.outfile)
 
 
 
 
 def mod2xyz(args):
+    import numpy as np
     # check inputs
     if not os.path.isfile(args.mesh):
         print(f"Error! Could not find mesh file: '{args.mesh}'")
@@ -127,16 +92,21 @@ def mod2xyz(args):
     nom = len(args.models) # number of models
     models = []
     for im in range(nom):
-        model = []
-        fopen = open(args.models[im], 'r')
-        flines = fopen.read().splitlines()
-        fopen.close()
-        try:
-            for line in flines:
-                model.append(float(line))
-        except Exception as e:
-            print(f"Model format error: '{args.models[im]}'.{e}")
-            exit(1)
+        # fast path: memory-mapped reading of one value per line
+        table = io.read_regular_columns(args.models[im])
+        if table is not None and table.shape[1] == 1:
+            model = table[:, 0]
+        else:
+            model = []
+            fopen = open(args.models[im], 'r')
+            flines = fopen.read().splitlines()
+            fopen.close()
+            try:
+                for line in flines:
+                    model.append(float(line))
+            except Exception as e:
+                print(f"Model format error: '{args.models[im]}'.{e}")
+                exit(1)
         if len(model) != (nx * ny * nz):
             print(f"Model format error: '{args.models[im]}'.\nNumber of cells does not match with the input mesh.")
             exit(1)
@@ -152,41 +122,24 @@ def mod2xyz(args):
             outdir = os.path.abspath(args.outdir)
             if not os.path.isdir(outdir):
                 os.makedirs(outdir, exist_ok=True)
-        outlines = [f" X Y Z {args.label}"]
-        index = -1
-        pos_cols = [[],[],[]]
-        val_cols = [[]]
-        for iy, y in enumerate(Y):
-            for ix, x in enumerate(X):
-                for iz, z in enumerate(Z):
-                    index += 1
-                    value = models[im][index]
-                    if args.skipdummy and value == -100.0:
-                        continue
-                    else:
-                        pos_cols[0].append(x)
-                        pos_cols[1].append(y)
-                        pos_cols[2].append(z)
-                        val_cols[0].append(value)
-                        outlines.append(f"%{args.fmt[0]}f %{args.fmt[0]}f %{args.fmt[0]}f %{args.fmt[1]}f" %(x, y, z, value))
+        # cell centers in model order (z varies fastest, then x, then y)
+        mesh_y, mesh_x, mesh_z = np.meshgrid(Y, X, Z, indexing='ij')
+        pos_cols = [mesh_x.ravel(), mesh_y.ravel(), mesh_z.ravel()]
+        value = np.array(models[im], dtype=float)
+        keep = np.ones(len(value), dtype=bool)
+        if args.skipdummy:
+            keep = value != -100.0
         args.outfile = os.path.join(outdir, f"{os.path.splitext(os.path.split(args.models[im])[1])[0]}.xyz")
         args.uniq = False
         args.sort = False
         args.append = False
         # apply point-in-polygon ?
         if len(args.polygon):
-            outlines = [f" X Y Z {args.label}"]
-            polygons = io.return_polygon_objects(args.polygon)
-            for ip in range(len(pos_cols[0])): # loop over points
-                pip = True
-                point = geographic.Point(pos_cols[0][ip], pos_cols[1][ip])
-                for polygon in  polygons:
-                    if not polygon.is_point_in(point):
-                        pip = False
-                if pip:
-                   outlines.append(f"%{args.fmt[0]}f %{args.fmt[0]}f %{args.fmt[0]}f %{args.fmt[1]}f" \
-                   %(pos_cols[0][ip], pos_cols[1][ip], pos_cols[2][ip], val_cols[0][ip]))
-        io.output_lines(outlines, args)
+            polygons = io.read_polygon_collection(args.polygon)
+            keep &= polygons.contains(pos_cols[0], pos_cols[1], 'intersection')
+        row_fmt = f"%{args.fmt[0]}f %{args.fmt[0]}f %{args.fmt[0]}f %{args.fmt[1]}f"
+        io.write_column_lines([col[keep] for col in pos_cols + [value]], row_fmt, args,
+                              header_lines=[f" X Y Z {args.label}"])
         print('Output:', args.outfile)
 
 